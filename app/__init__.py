@@ -3,7 +3,8 @@ import configparser
 from dotenv import load_dotenv
 from flask import Flask
 import os
-from .extensions import mongo
+from .extensions import cache, enrichment, metrics, mongo, profiler, scheduler, tmdb
+from .serialization import OrjsonProvider
 from flask_cors import CORS
 
 def create_app():
@@ -17,9 +18,59 @@ def create_app():
     # app.config["MONGO_URI"] = config['PROD']['DB_URI']
     # app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
     app.config["MONGO_URI"] = os.getenv("DB_URI")
+    app.config["CACHE_ENABLED"] = os.getenv("CACHE_ENABLED", "1") == "1"
+    app.config["CACHE_MAX_ENTRIES"] = int(os.getenv("CACHE_MAX_ENTRIES", 2048))
+    app.config["CACHE_REDIS_URL"] = os.getenv("CACHE_REDIS_URL")
 
     # Initialize extensions
+    if os.getenv("METRICS_ENABLED", "1") == "1":
+        # Before mongo: the command listener must exist when the client is created.
+        metrics.init_app(app, tmdb, gauges={
+            "enrichment_queue_depth": ("Enrichment jobs waiting.", lambda: enrichment.get_stats()["depth"]),
+            "cache_entries": ("Entries in the response cache.", lambda: len(cache.backend))
+        })
+    if float(os.getenv("SLOW_QUERY_MS", 0)) > 0:
+        profiler.init_app(app, mongo)
     mongo.init_app(app)
+    # After mongo: Flask-PyMongo installs its (bson.json_util) provider in init_app.
+    app.json = OrjsonProvider(app)
+    cache.init_app(app)
+    tmdb.init_app(app)
+    enrichment.init_app(app)
+
+    # Indexes (idempotent, see app/indexes.py)
+    if os.getenv("ENSURE_INDEXES", "1") == "1":
+        from .indexes import ensure_indexes
+        try:
+            ensure_indexes(mongo.db)
+        except Exception as e:
+            print("❌ Could not ensure indexes:", e)
+
+    # Background jobs (started with the first request)
+    if os.getenv("SCHEDULER_ENABLED", "1") == "1":
+        from .jobs import run_job
+        from .models.genre import Genre
+        from .services.movie_service import MovieService
+        from .services.analytics_service import ANALYTICS_REFRESH_SECONDS, AnalyticsService
+        from .services.rail_service import RailService
+        # Every worker polls them; the jobs lock and `every` let a single one run each period.
+        # Results are recorded on the job document, hence the small summaries.
+        poll = int(os.getenv("JOBS_POLL_SECONDS", 300))
+        for name, interval, func in [
+            ("home_rails", int(os.getenv("HOME_RAILS_REFRESH_SECONDS", 900)),
+             lambda: {"rails": len(RailService(mongo).refresh_home_rails()["rails"])}),
+            ("analytics_overview", ANALYTICS_REFRESH_SECONDS,
+             lambda: {"version": AnalyticsService(mongo).refresh_overview()["version"]}),
+            ("now_playing_sync", int(os.getenv("NOW_PLAYING_SYNC_SECONDS", 21600)),
+             lambda: MovieService(mongo).update_latest_movies()),
+            ("genre_stats", int(os.getenv("GENRE_STATS_RECONCILE_SECONDS", 86400)),
+             lambda: Genre.rebuild_stats(mongo)),
+        ]:
+            scheduler.add_job(
+                name, min(interval, poll),
+                lambda name=name, interval=interval, func=func: run_job(mongo, name, func, every=interval)
+            )
+        scheduler.init_app(app)
 
     # print(mongo.db.list_collection_names())
     # Register blueprints
@@ -27,16 +78,22 @@ def create_app():
     from .routes.genres import genres_bp
     from .routes.actors import actors_bp
     from .routes.favorites import favorites_bp
+    from .routes.admin import admin_bp
 
     app.register_blueprint(movies_bp, url_prefix='/films')
     app.register_blueprint(genres_bp, url_prefix='/genres')
     app.register_blueprint(actors_bp, url_prefix='/actors')
     app.register_blueprint(favorites_bp, url_prefix='/favorites')
+    app.register_blueprint(admin_bp, url_prefix='/admin')
 
     # Error handlers
     from .errors.handlers import register_error_handlers
     register_error_handlers(app)
 
+    # CLI commands
+    from .commands import register_commands
+    register_commands(app)
+
     @app.route('/')
     def index():
         return {'message': 'Bienvenue sur l’API Movie-App 🎬'}, 200
@@ -0,0 +1,182 @@
+import functools
+import inspect
+import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+try:
+    import redis
+except ImportError:  # the shared backend is optional
+    redis = None
+
+
+class LocalBackend:
+    """In-process LRU bounded by entry count, with per-entry expiry and tags."""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tags = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value, tags = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl, tags):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, set()):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            for tag in entry[2]:
+                self._tags.get(tag, set()).discard(key)
+
+
+class RedisBackend:
+    """Cache shared between workers; tags are stored as Redis sets of keys."""
+
+    def __init__(self, url, prefix="movie-app:"):
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return False, None
+        return True, pickle.loads(raw)
+
+    def set(self, key, value, ttl, tags):
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, pickle.dumps(value), ex=max(int(ttl), 1))
+        for tag in tags:
+            pipe.sadd(f"{self.prefix}tag:{tag}", key)
+        pipe.execute()
+
+    def invalidate_tags(self, tags):
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            keys = [self.prefix + k.decode() for k in self.client.smembers(tag_key)]
+            self.client.delete(tag_key, *keys)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def __len__(self):
+        return sum(1 for _ in self.client.scan_iter(f"{self.prefix}*"))
+
+
+class Cache:
+    """Response cache for service methods.
+
+    Concurrent misses on the same key are coalesced: one caller runs the
+    query, the others wait for it and read its result from the backend.
+    """
+
+    def __init__(self):
+        self.backend = LocalBackend()
+        self.enabled = True
+        self.stats = defaultdict(lambda: {"hits": 0, "misses": 0, "coalesced": 0})
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get("CACHE_ENABLED", True)
+        url = app.config.get("CACHE_REDIS_URL")
+        if url and redis is not None:
+            self.backend = RedisBackend(url)
+        else:
+            if url:
+                print("⚠️ CACHE_REDIS_URL set but redis is not installed, using the local cache.")
+            self.backend = LocalBackend(app.config.get("CACHE_MAX_ENTRIES", 2048))
+
+    def cached(self, ttl, tags=()):
+        """Cache the (non-None) result of a function or method for `ttl` seconds.
+
+        `tags` is a list of tag names, or a callable receiving the call's
+        arguments and returning them.
+        """
+        def decorator(func):
+            name = f"{func.__module__}.{func.__qualname__}"
+            is_method = next(iter(inspect.signature(func).parameters), None) == "self"
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                key_args = args[1:] if is_method else args
+                key = f"{name}:{key_args!r}:{sorted(kwargs.items())!r}"
+                entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+                return self.get_or_compute(name, key, ttl, entry_tags, lambda: func(*args, **kwargs))
+            return wrapper
+        return decorator
+
+    def get_or_compute(self, name, key, ttl, tags, compute):
+        stats = self.stats[name]
+        hit, value = self.backend.get(key)
+        if hit:
+            stats["hits"] += 1
+            return value
+
+        with self._lock:
+            lock = self._inflight.setdefault(key, threading.Lock())
+        try:
+            with lock:
+                hit, value = self.backend.get(key)
+                if hit:
+                    stats["coalesced"] += 1
+                    return value
+                stats["misses"] += 1
+                value = compute()
+                if value is not None:
+                    self.backend.set(key, value, ttl, list(tags))
+                return value
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is lock:
+                    del self._inflight[key]
+
+    def invalidate(self, *tags):
+        self.backend.invalidate_tags(tags)
+
+    def clear(self):
+        self.backend.clear()
+
+    def get_stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "functions": {name: dict(counters) for name, counters in sorted(self.stats.items())}
+        }
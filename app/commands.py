@@ -0,0 +1,114 @@
+import click
+from flask.cli import AppGroup
+
+from .extensions import cache, mongo
+from .indexes import DEDUPE, check_queries, ensure_indexes, remove_duplicates
+from .jobs import run_job
+from .models.actor import Actor
+from .models.genre import Genre
+from .models.movie import Movie
+from .models.title_word import TitleWord
+
+indexes_cli = AppGroup("indexes", help="Manage the MongoDB indexes.")
+movies_cli = AppGroup("movies", help="Maintenance jobs on the movies collection.")
+genres_cli = AppGroup("genres", help="Maintenance jobs on the genres statistics.")
+actors_cli = AppGroup("actors", help="Maintenance jobs on the actors collection.")
+
+
+@indexes_cli.command("ensure")
+def ensure_indexes_command():
+    """Create every index declared in app/indexes.py."""
+    created, failed = ensure_indexes(mongo.db)
+    click.echo(f"✅ {len(created)} index(es) ensured.")
+    if failed:
+        raise click.ClickException(f"{len(failed)} index(es) not created: {', '.join(failed)}")
+
+
+@indexes_cli.command("dedupe")
+def dedupe_command():
+    """Merge the duplicates blocking the unique indexes (movies, actors, favorites)."""
+    for collection in DEDUPE:
+        removed, repointed = remove_duplicates(mongo.db, collection)
+        click.echo(f"✅ {collection}: {removed} duplicate(s) removed, {repointed} reference(s) updated.")
+
+
+@indexes_cli.command("check")
+def check_indexes_command():
+    """Fail if any registered query is still planned as a COLLSCAN."""
+    failures = check_queries(mongo.db)
+    if failures:
+        raise click.ClickException(f"{len(failures)} query(ies) without index: {', '.join(failures)}")
+    click.echo("✅ Every registered query uses an index.")
+
+
+@movies_cli.command("migrate-derived-fields")
+@click.option("--batch-size", default=1000, show_default=True)
+def migrate_derived_fields_command(batch_size):
+    """Store release_year, decade, released_at and search_language on every movie."""
+    updated = Movie.migrate_derived_fields(mongo, batch_size)
+    click.echo(f"✅ {updated} movie(s) migrated.")
+
+
+@movies_cli.command("build-title-index")
+@click.option("--batch-size", default=1000, show_default=True, help="Batch size of the derived-fields backfill.")
+def build_title_index_command(batch_size):
+    """Rebuild the title word-frequency index (title_words)."""
+    Movie.migrate_derived_fields(mongo, batch_size)
+    count = TitleWord.rebuild(mongo)
+    click.echo(f"✅ {count} (word, genre, decade) entries indexed.")
+
+@movies_cli.command("sync")
+@click.option("--pages", default=2, show_default=True, help="Number of TMDB now_playing pages.")
+def sync_now_playing_command(pages):
+    """Sync TMDB's now playing movies into the database."""
+    from .services.movie_service import MovieService
+    job = run_job(mongo, "now_playing_sync", lambda: MovieService(mongo).update_latest_movies(pages))
+    if job is None:
+        raise click.ClickException("A now_playing_sync job is already running.")
+    if job["status"] != "done":
+        raise click.ClickException(job["error"])
+    click.echo(f"✅ {job['result']}")
+
+@movies_cli.command("backfill-credits")
+@click.option("--batch-size", default=100, show_default=True)
+@click.option("--workers", default=8, show_default=True, help="Concurrent TMDB requests.")
+@click.option("--limit", type=int, default=None, help="Stop after this many movies.")
+@click.option("--restart", is_flag=True, help="Ignore the saved checkpoint.")
+def backfill_credits_command(batch_size, workers, limit, restart):
+    """Fetch credits and videos for every movie that has none yet (resumable)."""
+    from .services.backfill_service import BackfillService
+    totals = BackfillService(mongo).run(batch_size, workers, limit, restart)
+    click.echo(f"✅ {totals}")
+
+@movies_cli.command("build-similar")
+@click.option("-k", "--neighbours", default=20, show_default=True, help="Neighbours kept per movie.")
+@click.option("--dims", default=256, show_default=True, help="Dimensions of the projected overview TF-IDF.")
+@click.option("--vocab-size", default=50000, show_default=True)
+@click.option("--block-size", default=4096, show_default=True, help="Rows per similarity block.")
+def build_similar_command(neighbours, dims, vocab_size, block_size):
+    """Rebuild the similar movies index (similar_movies)."""
+    from .similarity import rebuild
+    stats = rebuild(mongo.db, neighbours, dims, vocab_size, block_size)
+    cache.invalidate("movies")
+    click.echo(f"✅ {stats}")
+
+@genres_cli.command("rebuild-stats")
+def rebuild_genre_stats_command():
+    """Recompute genre_stats from the movies collection."""
+    count = Genre.rebuild_stats(mongo)
+    click.echo(f"✅ {count} genre(s) in genre_stats.")
+
+
+@actors_cli.command("backfill-filmographies")
+@click.option("--batch-size", default=500, show_default=True)
+def backfill_filmographies_command(batch_size):
+    """Embed the filmography of actors enriched before it existed (no TMDB call)."""
+    updated = Actor.backfill_filmographies(mongo, batch_size)
+    click.echo(f"✅ {updated} actor(s) updated.")
+
+
+def register_commands(app):
+    app.cli.add_command(indexes_cli)
+    app.cli.add_command(movies_cli)
+    app.cli.add_command(genres_cli)
+    app.cli.add_command(actors_cli)
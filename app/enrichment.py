@@ -0,0 +1,107 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+
+class EnrichmentQueue:
+    """Bounded worker pool for background database enrichment.
+
+    A job is identified by a key ("movie:<id>", "actor:<id>"): a key already
+    queued or running is not submitted twice, and when the queue is full new
+    jobs are dropped rather than blocking the request that submitted them.
+    Workers start with the first job and drain the queue at shutdown.
+    """
+
+    def __init__(self):
+        self.max_workers = 4
+        self.max_size = 1000
+        self._queue = None
+        self._threads = []
+        self._inflight = set()
+        self._closed = False
+        self._lock = threading.Lock()
+        self.stats = {
+            "submitted": 0, "deduplicated": 0, "dropped": 0, "processed": 0, "failed": 0,
+            "wait_total": 0.0, "wait_max": 0.0, "run_total": 0.0, "run_max": 0.0
+        }
+
+    def init_app(self, app):
+        self.max_workers = int(os.getenv("ENRICHMENT_WORKERS", 4))
+        self.max_size = int(os.getenv("ENRICHMENT_QUEUE_SIZE", 1000))
+        atexit.register(self.shutdown)
+
+    def submit(self, key, func):
+        """Queue `func` under `key`; returns False when deduplicated or dropped."""
+        with self._lock:
+            if self._closed:
+                return False
+            if key in self._inflight:
+                self.stats["deduplicated"] += 1
+                return False
+            if self._queue is None:
+                self._start()
+            try:
+                self._queue.put_nowait((key, func, time.monotonic()))
+            except queue.Full:
+                self.stats["dropped"] += 1
+                print(f"⚠️ Enrichment queue full, dropped {key}")
+                return False
+            self._inflight.add(key)
+            self.stats["submitted"] += 1
+            return True
+
+    def _start(self):
+        self._queue = queue.Queue(maxsize=self.max_size)
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._work, name=f"enrichment-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            key, func, enqueued_at = item
+            started_at = time.monotonic()
+            failed = False
+            try:
+                func()
+            except Exception as e:
+                failed = True
+                print(f"❌ Enrichment {key} failed:", e)
+            finished_at = time.monotonic()
+            with self._lock:
+                self._inflight.discard(key)
+                self.stats["failed" if failed else "processed"] += 1
+                self.stats["wait_total"] += started_at - enqueued_at
+                self.stats["wait_max"] = max(self.stats["wait_max"], started_at - enqueued_at)
+                self.stats["run_total"] += finished_at - started_at
+                self.stats["run_max"] = max(self.stats["run_max"], finished_at - started_at)
+
+    def shutdown(self, timeout=30):
+        """Stop accepting jobs, let the workers finish the queued ones, then stop them."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._queue is None:
+                return
+        for _ in self._threads:
+            self._queue.put(None)
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["inflight"] = len(self._inflight)
+        done = stats["processed"] + stats["failed"]
+        stats["depth"] = self._queue.qsize() if self._queue else 0
+        stats["workers"] = sum(thread.is_alive() for thread in self._threads)
+        stats["wait_avg"] = stats["wait_total"] / done if done else 0.0
+        stats["run_avg"] = stats["run_total"] / done if done else 0.0
+        return stats
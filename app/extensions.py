@@ -1,3 +1,16 @@
 from flask_pymongo import PyMongo
 
+from .cache import Cache
+from .enrichment import EnrichmentQueue
+from .metrics import Metrics
+from .profiler import SlowQueryProfiler
+from .scheduler import Scheduler
+from .tmdb import TmdbClient
+
 mongo = PyMongo()
+cache = Cache()
+enrichment = EnrichmentQueue()
+metrics = Metrics()
+profiler = SlowQueryProfiler()
+scheduler = Scheduler()
+tmdb = TmdbClient()
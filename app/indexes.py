@@ -0,0 +1,239 @@
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.models.movie import HAS_POSTER
+from app.models.title_word import TOP_WORDS_INDEX
+
+# Index registry: every query issued by the models/services must be covered by
+# one of these specs. `ensure_indexes` is idempotent, so it runs at startup.
+INDEXES = {
+    "movies": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("popularity", DESCENDING), ("_id", ASCENDING)], name="popularity_id"),
+        IndexModel([("vote_average", DESCENDING), ("vote_count", DESCENDING)], name="rating"),
+        # Also the keyset orders of Movie.get_page: (sort value, _id).
+        IndexModel([("release_date", DESCENDING), ("_id", ASCENDING)], name="release_date_id"),
+        IndexModel([("vote_average", DESCENDING), ("_id", ASCENDING)], name="vote_average_id"),
+        IndexModel(
+            [("decade", ASCENDING), ("vote_average", DESCENDING), ("vote_count", DESCENDING)],
+            name="decade_rating"
+        ),
+        IndexModel([("decade", ASCENDING), ("released_at", ASCENDING)], name="decade_released_at"),
+        IndexModel(
+            [("genres.name", ASCENDING), ("vote_average", DESCENDING), ("vote_count", DESCENDING)],
+            name="genre_rating"
+        ),
+        IndexModel(
+            [("original_language", ASCENDING), ("vote_average", DESCENDING), ("vote_count", DESCENDING)],
+            name="language_rating_poster",
+            partialFilterExpression=HAS_POSTER
+        ),
+        IndexModel([("runtime", ASCENDING)], name="runtime_poster", partialFilterExpression=HAS_POSTER),
+        IndexModel([("enriched_at", ASCENDING), ("_id", ASCENDING)], name="enriched_at_id"),
+        IndexModel([("created_at", ASCENDING)], name="created_at"),
+        IndexModel([("fetched_at", ASCENDING)], name="fetched_at"),
+        IndexModel(
+            [("title", TEXT), ("overview", TEXT)],
+            name="title_overview_text",
+            weights={"title": 10, "overview": 1},
+            default_language="english",
+            language_override="search_language"
+        ),
+    ],
+    "analytics_snapshots": [
+        IndexModel([("version", DESCENDING)], name="version_unique", unique=True),
+    ],
+    "actors": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "actor_movies": [
+        IndexModel([("actor_id", ASCENDING), ("popularity", DESCENDING), ("_id", ASCENDING)], name="actor_popularity"),
+        IndexModel([("movie_id", ASCENDING)], name="movie_id"),
+    ],
+    "title_words": [TOP_WORDS_INDEX],
+    "jobs": [
+        IndexModel(
+            [("name", ASCENDING)], name="active_name_unique", unique=True,
+            partialFilterExpression={"active": True}
+        ),
+        IndexModel([("name", ASCENDING), ("started_at", DESCENDING)], name="name_started_at"),
+    ],
+    "favorites": [
+        IndexModel([("ip", ASCENDING), ("movie_id", ASCENDING)], name="ip_movie_unique", unique=True),
+        IndexModel([("ip", ASCENDING), ("added_at", DESCENDING), ("_id", DESCENDING)], name="ip_added_at_id"),
+    ],
+}
+
+# Queries checked by `flask indexes check`: (model method, collection, filter, sort).
+QUERIES = [
+    ("Movie.get_latest", "movies",
+     {"release_date": {"$exists": True, "$ne": ""}}, [("release_date", -1)]),
+    ("Movie.get_popular", "movies", {}, [("popularity", -1)]),
+    ("Movie.get_page", "movies", {}, [("_id", 1)]),
+    ("Movie.get_top_rated_movies", "movies", HAS_POSTER, [("vote_average", -1)]),
+    ("Movie.get_underrated_gems", "movies",
+     {"vote_average": {"$gte": 7}, "vote_count": {"$lte": 100}, **HAS_POSTER}, [("vote_average", -1)]),
+    ("Movie.get_hottest_movies", "movies",
+     {"release_date": {"$gte": "2000-01-01"}, "vote_count": {"$gte": 100}, "vote_average": {"$gte": 6.0}, **HAS_POSTER},
+     [("vote_average", -1), ("vote_count", -1)]),
+    ("Movie.get_most_popular", "movies", HAS_POSTER, [("popularity", -1)]),
+    ("Movie.get_critically_acclaimed", "movies",
+     {"vote_average": {"$gte": 8}, "vote_count": {"$gt": 1000}}, [("vote_average", -1)]),
+    ("Movie.get_long_movies", "movies", {"runtime": {"$gte": 150}, **HAS_POSTER}, None),
+    ("Movie.get_short_movies", "movies", {"runtime": {"$lte": 90}, **HAS_POSTER}, None),
+    ("Movie.get_best_french_movies", "movies",
+     {"original_language": "fr", "vote_count": {"$gte": 100}, **HAS_POSTER},
+     [("vote_average", -1), ("vote_count", -1)]),
+    ("Movie.get_best_action_movies", "movies",
+     {"genres.name": "Action", "vote_count": {"$gte": 100}, **HAS_POSTER},
+     [("vote_average", -1), ("vote_count", -1)]),
+    ("Movie.get_movies_by_genre", "movies", {"genres.name": "Science Fiction", **HAS_POSTER}, None),
+    ("Movie.get_best_movie_for_decade", "movies",
+     {"decade": 1990, "vote_average": {"$gt": 0}, "vote_count": {"$gt": 0}, "poster_path": {"$type": "string", "$ne": ""}},
+     [("vote_average", -1), ("vote_count", -1)]),
+    ("Movie.get_best_movies_per_decade", "movies",
+     {"decade": 1990, "vote_average": {"$gt": 0}, "vote_count": {"$gt": 50}},
+     [("vote_average", -1), ("vote_count", -1)]),
+    ("Movie.get_movies_by_decade", "movies", {"decade": 1990}, None),
+    ("Movie.get_movies_from_90s", "movies", {"decade": 1990}, [("released_at", 1)]),
+    ("Movie.get_true_stories", "movies", {"$text": {"$search": '"true story"'}}, None),
+    ("Movie.search_movies", "movies", {}, [("popularity", -1), ("_id", 1)]),
+    ("BackfillService._next_batch", "movies",
+     {"enriched_at": None, "credits": {"$exists": False}}, [("_id", 1)]),
+    ("Movie.export", "movies",
+     {"$or": [{"created_at": {"$gte": datetime(2025, 1, 1)}}, {"fetched_at": {"$gte": datetime(2025, 1, 1)}}]}, None),
+    ("Movie.get_page", "movies", {"popularity": {"$gte": 0}}, [("popularity", -1), ("_id", 1)]),
+    ("Movie.get_page", "movies", {"vote_average": {"$gte": 0}}, [("vote_average", -1), ("_id", 1)]),
+    ("Movie.get_page", "movies", {"release_date": {"$gt": ""}}, [("release_date", -1), ("_id", 1)]),
+    ("Movie.get_enriched", "movies", {"id": {"$in": [550, 680]}, "credits.directors": {"$type": "array"}}, None),
+    ("Actor.get_details", "actors", {"id": 1}, None),
+    ("Actor.get_movies", "actor_movies", {"actor_id": 31}, [("popularity", -1), ("_id", 1)]),
+    ("Actor.refresh_filmographies", "actor_movies", {"movie_id": {"$in": [550, 680]}}, None),
+    ("run_job", "jobs", {"name": "home_rails", "started_at": {"$gte": datetime(2025, 1, 1)}}, None),
+    ("TitleWord.get_top", "title_words", {"genre": None, "decade": None, "count": {"$gt": 0}}, [("count", -1)]),
+    ("Favorite.get_page", "favorites", {"ip": "127.0.0.1", "active": {"$ne": False}}, [("added_at", -1), ("_id", -1)]),
+    ("Favorite.active_ids", "favorites", {"ip": "127.0.0.1", "movie_id": {"$in": [550, 680]}}, None),
+    ("MovieService.get_recommendations", "movies",
+     {"genres.name": {"$in": ["Drama", "Comedy"]}, "vote_average": {"$gte": 7.0}, "id": {"$nin": [550]}},
+     [("vote_average", -1)]),
+]
+
+
+# Duplicates that block a unique index (re-run CSV imports, racing actor
+# enrichments or favorite inserts before the indexes existed): key fields,
+# which one survives (the most recent) and the fields holding their _ids.
+DEDUPE = {
+    "movies": {
+        "keys": ["id"],
+        "recency": [("fetched_at", DESCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        "references": {"actors": ["movie_ids"]},
+    },
+    "actors": {
+        "keys": ["id"],
+        "recency": [("fetched_at", DESCENDING), ("_id", DESCENDING)],
+        "references": {"movies": ["credits.cast", "credits.crew", "credits.directors", "credits.writers"]},
+    },
+    "favorites": {
+        "keys": ["ip", "movie_id"],
+        "recency": [("updated_at", DESCENDING), ("_id", DESCENDING)],
+        "references": {},
+    },
+}
+
+
+def _repoint(db, collection, field, survivor_of):
+    """Point the stale _ids listed in `field` to their survivor, keeping order and dropping repeats."""
+    updates = []
+    for doc in db[collection].find({field: {"$in": list(survivor_of)}}, {field: 1}):
+        value = doc
+        for part in field.split("."):
+            value = value.get(part) or {}
+        ids = list(dict.fromkeys(survivor_of.get(_id, _id) for _id in value))
+        updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {field: ids}}))
+    if not updates:
+        return 0
+    return db[collection].bulk_write(updates, ordered=False).modified_count
+
+
+def remove_duplicates(db, collection, batch_size=500):
+    """Merge the duplicates of a DEDUPE collection into its most recent document per key.
+
+    References to the other copies are re-pointed to the survivor first, then
+    the copies are deleted, so an interrupted run can simply be started again.
+    Returns (documents removed, referencing documents updated).
+    """
+    spec = DEDUPE[collection]
+    pipeline = [
+        {"$match": {key: {"$exists": True} for key in spec["keys"]}},
+        {"$sort": dict(spec["recency"])},
+        {"$group": {
+            "_id": {f"k{i}": f"${key}" for i, key in enumerate(spec["keys"])},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$project": {"ids": 1}},
+    ]
+    removed = repointed = 0
+    groups = db[collection].aggregate(pipeline, allowDiskUse=True)
+    while batch := [group["ids"] for _, group in zip(range(batch_size), groups)]:
+        survivor_of = {_id: ids[0] for ids in batch for _id in ids[1:]}
+        for referencing, fields in spec["references"].items():
+            for field in fields:
+                repointed += _repoint(db, referencing, field, survivor_of)
+        removed += db[collection].delete_many({"_id": {"$in": list(survivor_of)}}).deleted_count
+    return removed, repointed
+
+
+def ensure_indexes(db):
+    """Create every registered index; already existing ones are left untouched.
+
+    Never deletes anything: a unique index blocked by duplicates fails and
+    `flask indexes dedupe` merges them. Returns the created index names and
+    the `collection.index` names that failed.
+    """
+    created, failed = [], []
+    for collection, models in INDEXES.items():
+        for model in models:
+            name = model.document["name"]
+            try:
+                created.extend(db[collection].create_indexes([model]))
+            except PyMongoError as e:
+                hint = " (run `flask indexes dedupe`)" if getattr(e, "code", None) == 11000 else ""
+                print(f"❌ Index {collection}.{name} not created{hint}:", e)
+                failed.append(f"{collection}.{name}")
+    return created, failed
+
+
+def plan_stages(plan):
+    """Flatten an explain() winning plan into the list of its stage names."""
+    if not isinstance(plan, dict):
+        return []
+    stages = [plan["stage"]] if "stage" in plan else []
+    for key in ("inputStage", "queryPlan"):
+        stages.extend(plan_stages(plan.get(key)))
+    for child in plan.get("inputStages", []):
+        stages.extend(plan_stages(child))
+    return stages
+
+
+def explain_query(db, collection, query, sort=None):
+    cursor = db[collection].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    explain = cursor.limit(15).explain()
+    return plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+
+
+def check_queries(db):
+    """Explain every registered query and return the names of those planning a COLLSCAN."""
+    failures = []
+    for name, collection, query, sort in QUERIES:
+        stages = explain_query(db, collection, query, sort)
+        status = "❌" if "COLLSCAN" in stages else "✅"
+        print(f"{status} {name}: {' <- '.join(stages)}")
+        if "COLLSCAN" in stages:
+            failures.append(name)
+    return failures
@@ -0,0 +1,8 @@
+"""Bulk import of the TMDB movie dataset (CSV) into MongoDB.
+
+    python -m app.ingest TMDB_movie_dataset_v11.csv [--chunk-size 5000] [--workers 4] [--start-row 0]
+
+The file is streamed in chunks of rows; chunks are cleaned in a process pool
+while the main process maps genres to their ids and upserts each chunk with
+one unordered bulk write, so memory stays constant whatever the file size.
+"""
\ No newline at end of file
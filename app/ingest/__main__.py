@@ -0,0 +1,69 @@
+import argparse
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import certifi
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from app.indexes import ensure_indexes
+from app.ingest.load import GenreMap, load_chunk
+from app.ingest.parse import parse_chunk, read_chunks
+
+
+def ingest(db, path, chunk_size=5000, workers=None, start_row=0):
+    """Import the CSV at `path`; returns the totals."""
+    ensure_indexes(db)
+    genres = GenreMap(db)
+    totals = {"rows": 0, "inserted": 0, "existing": 0}
+    skipped = Counter()
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Chunks are written in file order, with a bounded number parsed ahead,
+        # so the printed row number is a safe --start-row to resume from.
+        pending = deque()
+        chunks = read_chunks(path, chunk_size, start_row)
+        ahead = 2 * (workers or os.cpu_count() or 1)
+        for first_row, rows in chunks:
+            pending.append((first_row, len(rows), executor.submit(parse_chunk, rows)))
+            if len(pending) >= ahead:
+                _write(db, genres, pending.popleft(), totals, skipped, started)
+        while pending:
+            _write(db, genres, pending.popleft(), totals, skipped, started)
+
+    totals["skipped"] = dict(skipped)
+    totals["duration"] = round(time.perf_counter() - started, 3)
+    return totals
+
+
+def _write(db, genres, item, totals, skipped, started):
+    first_row, size, future = item
+    movies, chunk_skipped = future.result()
+    inserted = load_chunk(db, genres, movies)
+    totals["rows"] += size
+    totals["inserted"] += inserted
+    totals["existing"] += len(movies) - inserted
+    skipped.update(chunk_skipped)
+    elapsed = time.perf_counter() - started
+    print(f"🎬 rows {first_row}-{first_row + size}: {totals['inserted']} inserted, "
+          f"{sum(skipped.values())} skipped ({totals['rows'] / elapsed:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    os.environ["SSL_CERT_FILE"] = certifi.where()
+
+    parser = argparse.ArgumentParser(prog="python -m app.ingest", description="Import the TMDB movie dataset (CSV) into MongoDB")
+    parser.add_argument("csv_file")
+    parser.add_argument("--db-uri", default=os.getenv("DB_URI"), help="defaults to DB_URI")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows parsed and written per batch")
+    parser.add_argument("--workers", type=int, default=None, help="parsing processes (default: CPU count)")
+    parser.add_argument("--start-row", type=int, default=0, help="resume after this many data rows")
+    args = parser.parse_args()
+
+    client = MongoClient(args.db_uri)
+    totals = ingest(client.get_default_database("db"), args.csv_file, args.chunk_size, args.workers, args.start_row)
+    print(f"✅ {totals}")
@@ -0,0 +1,48 @@
+from app.models.bulk import upsert_by_tmdb_id
+from app.models.genre import Genre
+from app.models.title_word import TitleWord
+
+
+class GenreMap:
+    """In-memory genre name -> id map, backed by the genres collection.
+
+    Loaded once; unknown names get the next free id and are inserted in one
+    batch, so a chunk costs at most one write to genres.
+    """
+
+    def __init__(self, db):
+        self.collection = db.genres
+        self.ids = {genre["name"]: genre["_id"] for genre in self.collection.find({}, {"name": 1})}
+        self.next_id = max(self.ids.values(), default=0) + 1
+
+    def resolve(self, movies):
+        """Replace each movie's genre names by {"id", "name"} objects."""
+        new_genres = []
+        for movie in movies:
+            for name in movie["genres"]:
+                if name not in self.ids:
+                    self.ids[name] = self.next_id
+                    new_genres.append({"_id": self.next_id, "name": name})
+                    self.next_id += 1
+        if new_genres:
+            self.collection.insert_many(new_genres, ordered=False)
+            print(f"🟩 {len(new_genres)} new genre(s): {', '.join(g['name'] for g in new_genres)}")
+        for movie in movies:
+            movie["genres"] = [{"id": self.ids[name], "name": name} for name in movie["genres"]]
+        return movies
+
+
+def load_chunk(db, genres, movies):
+    """Upsert a cleaned chunk on the unique `id` index; returns the number of inserted movies.
+
+    Movies already in the collection are left untouched, so replaying a chunk
+    (e.g. when resuming) is harmless; only inserted ones are counted in
+    genre_stats and title_words.
+    """
+    if not movies:
+        return 0
+    _, inserted = upsert_by_tmdb_id(db.movies, genres.resolve(movies))
+    if inserted:
+        db.genre_stats.bulk_write(Genre.stats_updates(inserted), ordered=False)
+        db.title_words.bulk_write(TitleWord.updates(inserted), ordered=False)
+    return len(inserted)
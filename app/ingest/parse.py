@@ -0,0 +1,71 @@
+import csv
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+
+from app.models.movie import Movie
+
+INT_FIELDS = ("id", "vote_count", "revenue", "runtime", "budget")
+FLOAT_FIELDS = ("vote_average", "popularity")
+
+
+def read_chunks(path, chunk_size, start_row=0):
+    """Yield (first row number, rows) chunks of the CSV, skipping the first `start_row` rows."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.DictReader(f)
+        row_number = start_row
+        for _ in islice(rows, start_row):
+            pass
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield row_number, chunk
+            row_number += len(chunk)
+
+
+def _number(value, cast):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def clean_row(row):
+    """Typed movie document from a CSV row, or (None, reason) when the row is skipped.
+
+    Empty cells become None, and genres become a list of names (their ids are
+    resolved by the loader, which owns the genre map).
+    """
+    movie = {key: (value if value != "" else None) for key, value in row.items()}
+    for field in INT_FIELDS:
+        movie[field] = _number(movie.get(field), lambda value: int(float(value)))
+    for field in FLOAT_FIELDS:
+        movie[field] = _number(movie.get(field), float)
+    movie["adult"] = movie.get("adult") == "True"
+
+    if movie["id"] is None:
+        return None, "invalid id"
+    if movie["adult"]:
+        return None, "adult"
+    names = [name.strip() for name in (movie.get("genres") or "").split(",") if name.strip()]
+    if not names:
+        return None, "missing genres"
+    movie["genres"] = names
+    movie.update(Movie.derived_fields(movie))
+    return movie, None
+
+
+def parse_chunk(rows):
+    """Clean a chunk of rows (run in the worker processes); returns (movies, skipped reasons)."""
+    movies = []
+    skipped = Counter()
+    now = datetime.utcnow()
+    for row in rows:
+        movie, reason = clean_row(row)
+        if movie is None:
+            skipped[reason] += 1
+        else:
+            movie["created_at"] = now
+            movies.append(movie)
+    return movies, skipped
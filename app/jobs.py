@@ -0,0 +1,83 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+STALE_AFTER = timedelta(hours=6)
+
+
+def _create(mongo, name):
+    """Record a new job; returns (job_id, created). Only one active job per name."""
+    job = {
+        "_id": uuid.uuid4().hex,
+        "name": name,
+        "status": "queued",
+        "active": True,
+        "created_at": datetime.utcnow()
+    }
+    try:
+        mongo.db.jobs.insert_one(job)
+    except DuplicateKeyError:
+        # A process that died mid-job leaves it active: expire it after a while.
+        mongo.db.jobs.update_many(
+            {"name": name, "active": True, "created_at": {"$lt": datetime.utcnow() - STALE_AFTER}},
+            {"$set": {"active": False, "status": "failed", "error": "Job expired"}}
+        )
+        running = mongo.db.jobs.find_one({"name": name, "active": True}, {"_id": 1})
+        if running:
+            return running["_id"], False
+        return _create(mongo, name)
+    return job["_id"], True
+
+
+def _execute(mongo, job_id, func):
+    started = time.perf_counter()
+    mongo.db.jobs.update_one({"_id": job_id}, {"$set": {"status": "running", "started_at": datetime.utcnow()}})
+    try:
+        result = func()
+    except Exception as e:
+        print(f"❌ Job {job_id} failed:", e)
+        update = {"status": "failed", "error": str(e)}
+    else:
+        update = {"status": "done", "result": result}
+    update.update({
+        "active": False,
+        "finished_at": datetime.utcnow(),
+        "duration": round(time.perf_counter() - started, 3)
+    })
+    mongo.db.jobs.update_one({"_id": job_id}, {"$set": update})
+    return update
+
+
+def start_job(mongo, name, func):
+    """Run `func` on a background thread; returns the job id without waiting.
+
+    If a job with the same name is already running, its id is returned instead.
+    """
+    job_id, created = _create(mongo, name)
+    if created:
+        threading.Thread(target=_execute, args=(mongo, job_id, func), name=f"job-{name}", daemon=True).start()
+    return job_id
+
+
+def run_job(mongo, name, func, every=None):
+    """Run `func` in the calling thread, recorded as a job; None if one is already running.
+
+    With `every` (seconds), also None while the last run, by any process, is
+    less than `every` old: polled from every worker, a job then runs once per
+    period, and a restart neither re-runs it nor postpones it.
+    """
+    if every and mongo.db.jobs.find_one(
+        {"name": name, "started_at": {"$gte": datetime.utcnow() - timedelta(seconds=every)}}, {"_id": 1}
+    ):
+        return None
+    job_id, created = _create(mongo, name)
+    if not created:
+        return None
+    return {"job_id": job_id, **_execute(mongo, job_id, func)}
+
+
+def get_job(mongo, job_id):
+    return mongo.db.jobs.find_one({"_id": job_id}, {"active": 0})
@@ -0,0 +1,173 @@
+import bisect
+import re
+import threading
+import time
+from collections import Counter as Tally
+
+from flask import g, request
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, labels
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self.values)
+        lines += [f"{self.name}{_labels(self.labels, key)} {value}" for key, value in sorted(values.items())]
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; an observation is a bisect and a few additions under a lock."""
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.values.get(labels)
+            if series is None:
+                series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            values = {key: ([*counts], total, count) for key, (counts, total, count) in self.values.items()}
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Times every command sent by PyMongo, per collection and command name."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self._pending = {}
+
+    def started(self, event):
+        command = event.command
+        collection = command.get("collection") if event.command_name == "getMore" else command.get(event.command_name)
+        self._pending[(event.connection_id, event.request_id)] = collection if isinstance(collection, str) else "-"
+
+    def succeeded(self, event):
+        collection = self._finish(event, "ok")
+        cursor = event.reply.get("cursor") if isinstance(event.reply, dict) else None
+        if cursor:
+            batch = cursor.get("firstBatch", cursor.get("nextBatch", []))
+            self.metrics.mongo_documents.inc((collection, event.command_name), len(batch))
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+    def _finish(self, event, outcome):
+        collection = self._pending.pop((event.connection_id, event.request_id), "-")
+        self.metrics.mongo_duration.observe((collection, event.command_name, outcome), event.duration_micros / 1e6)
+        return collection
+
+
+class Metrics:
+    """Prometheus metrics for routes, MongoDB commands, TMDB calls and background threads.
+
+    Served in the text exposition format on /metrics. Everything is kept in
+    process: with several workers, each one exposes its own counters.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.gauges = {}
+        self.http_duration = Histogram(
+            "http_request_duration_seconds", "Request latency per route.", ("blueprint", "route", "method")
+        )
+        self.http_requests = Counter(
+            "http_requests_total", "Responses per route and status.", ("blueprint", "route", "method", "status")
+        )
+        self.mongo_duration = Histogram(
+            "mongo_command_duration_seconds", "MongoDB command latency.", ("collection", "command", "outcome")
+        )
+        self.mongo_documents = Counter(
+            "mongo_documents_returned_total", "Documents returned by cursors.", ("collection", "command")
+        )
+        self.tmdb_duration = Histogram(
+            "tmdb_request_duration_seconds", "TMDB API call latency, retries included.", ("path", "status")
+        )
+        self.collectors = [self.http_duration, self.http_requests, self.mongo_duration, self.mongo_documents,
+                           self.tmdb_duration]
+
+    def init_app(self, app, tmdb=None, gauges=None):
+        """Must run before the MongoDB client is created, for the command listener to apply."""
+        self.gauges = gauges or {}
+        if not self.enabled:
+            # Process-wide: applies to every MongoClient created from now on.
+            monitoring.register(MongoCommandListener(self))
+        self.enabled = True
+        if tmdb is not None and self.observe_tmdb not in tmdb.listeners:
+            tmdb.listeners.append(self.observe_tmdb)
+
+        @app.before_request
+        def start_timer():
+            g.metrics_started = time.perf_counter()
+
+        @app.after_request
+        def record_request(response):
+            started = g.pop("metrics_started", None)
+            if started is not None:
+                route = request.url_rule.rule if request.url_rule else "unmatched"
+                labels = (request.blueprint or "-", route, request.method)
+                self.http_duration.observe(labels, time.perf_counter() - started)
+                self.http_requests.inc((*labels, str(response.status_code)))
+            return response
+
+        app.add_url_rule("/metrics", "metrics", self.render_response)
+
+    def observe_tmdb(self, path, duration, status):
+        self.tmdb_duration.observe((re.sub(r"/\d+", "/{id}", path), str(status)), duration)
+
+    def render(self):
+        lines = []
+        for collector in self.collectors:
+            lines += collector.render()
+
+        threads = Tally(re.sub(r"[-_\d]+$", "", thread.name) for thread in threading.enumerate())
+        lines += ["# HELP app_threads Live threads per name (workers, jobs, pools).", "# TYPE app_threads gauge"]
+        lines += [f"app_threads{_labels(('name',), (name,))} {count}" for name, count in sorted(threads.items())]
+        for name, (help, read) in self.gauges.items():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {read()}"]
+        return "\n".join(lines) + "\n"
+
+    def render_response(self):
+        return self.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
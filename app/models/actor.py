@@ -4,31 +4,140 @@ from bson import ObjectId
 class Actor:
     from datetime import datetime
 from bson import ObjectId
-from threading import Thread
-import os
-import requests
+
+from pymongo import DeleteMany, ReplaceOne, UpdateMany, UpdateOne
+
+from app.extensions import cache, enrichment, tmdb
+from app.models.bulk import upsert_by_tmdb_id
+from app.models.movie import Movie
+from app.pagination import decode_cursor, encode_cursor, keyset_filter
+
+# Movies embedded in the actor document (the actor page); the rest is paginated from actor_movies.
+FILMOGRAPHY_SIZE = 20
+FILMOGRAPHY_FIELDS = ("title", "poster_path", "popularity")
 
 
 class Actor:
+    @staticmethod
+    def upsert_people(mongo, people):
+        """Map TMDB cast/crew members to actor _ids, inserting the unknown ones in bulk."""
+        now = datetime.utcnow()
+        ids, _ = upsert_by_tmdb_id(mongo.db.actors, [
+            {
+                "id": person["id"],
+                "name": person["name"],
+                "profile_path": person.get("profile_path"),
+                "popularity": person.get("popularity"),
+                "known_for_department": person.get("known_for_department"),
+                "fetched_at": now
+            }
+            for person in people
+        ])
+        return ids
+
+    @staticmethod
+    def store_filmography(mongo, actor_id, credits):
+        """Materialize an actor's movies in actor_movies; returns the top FILMOGRAPHY_SIZE by popularity."""
+        movies = {movie["id"]: movie for movie in credits}
+        mongo.db.actor_movies.bulk_write([
+            ReplaceOne(
+                {"_id": f"{actor_id}:{movie_id}"},
+                {"actor_id": actor_id, "movie_id": movie_id, **Actor._card_fields(movie),
+                 "character": movie.get("character")},
+                upsert=True
+            )
+            for movie_id, movie in movies.items()
+        ] + [DeleteMany({"actor_id": actor_id, "movie_id": {"$nin": list(movies)}})], ordered=False)
+        top = sorted(movies.values(), key=lambda m: m.get("popularity") or 0, reverse=True)[:FILMOGRAPHY_SIZE]
+        return [{"id": m["id"], **Actor._card_fields(m)} for m in top]
+
+    @staticmethod
+    def refresh_filmographies(mongo, movies):
+        """Propagate refreshed movies (title, poster, popularity) to the filmographies that list them.
+
+        Returns the TMDB ids of the actors whose embedded filmography was rebuilt.
+        """
+        if not movies:
+            return []
+        movie_ids = [movie["id"] for movie in movies]
+        mongo.db.actor_movies.bulk_write([
+            UpdateMany({"movie_id": movie["id"]}, {"$set": Actor._card_fields(movie)}) for movie in movies
+        ], ordered=False)
+        actor_ids = mongo.db.actor_movies.distinct("actor_id", {"movie_id": {"$in": movie_ids}})
+        if not actor_ids:
+            return []
+        top = mongo.db.actor_movies.aggregate([
+            {"$match": {"actor_id": {"$in": actor_ids}}},
+            {"$sort": {"actor_id": 1, "popularity": -1, "_id": 1}},
+            {"$group": {
+                "_id": "$actor_id",
+                "movies": {"$push": {"id": "$movie_id", **{field: f"${field}" for field in FILMOGRAPHY_FIELDS}}}
+            }},
+            {"$project": {"movies": {"$slice": ["$movies", FILMOGRAPHY_SIZE]}}}
+        ])
+        mongo.db.actors.bulk_write([
+            UpdateOne({"id": actor["_id"]}, {"$set": {"filmography": actor["movies"]}}) for actor in top
+        ], ordered=False)
+        return actor_ids
+
+    @staticmethod
+    def backfill_filmographies(mongo, batch_size=500):
+        """Build the filmography of actors enriched before it existed, from their movie_ids.
+
+        Without it their page is fetched from TMDB again on the next visit.
+        Characters are unknown here and stay empty until the next enrichment.
+        """
+        updated = 0
+        cursor = mongo.db.actors.find(
+            {"movie_ids": {"$exists": True}, "filmography": {"$exists": False}}, {"id": 1, "movie_ids": 1}
+        ).batch_size(batch_size)
+        for actor in cursor:
+            credits = list(mongo.db.movies.find(
+                {"_id": {"$in": actor["movie_ids"]}, "id": {"$ne": None}},
+                {"_id": 0, "id": 1, **{field: 1 for field in FILMOGRAPHY_FIELDS}}
+            ))
+            filmography = Actor.store_filmography(mongo, actor["id"], credits) if credits else []
+            mongo.db.actors.update_one({"_id": actor["_id"]}, {"$set": {"filmography": filmography}})
+            cache.invalidate(f"actor:{actor['id']}")
+            updated += 1
+        return updated
+
+    @staticmethod
+    def get_movies(mongo, actor_id, limit=20, cursor=None):
+        """An actor's whole filmography, most popular first, on the (actor_id, popularity, _id) index."""
+        query = {"actor_id": actor_id}
+        if cursor:
+            value, last_id = decode_cursor(cursor)
+            query.update(keyset_filter("popularity", -1, value, last_id))
+        movies = list(mongo.db.actor_movies.find(
+            query, {"movie_id": 1, "character": 1, **{field: 1 for field in FILMOGRAPHY_FIELDS}}
+        ).sort([("popularity", -1), ("_id", 1)]).limit(limit))
+        next_cursor = None
+        if len(movies) == limit:
+            next_cursor = encode_cursor(movies[-1].get("popularity"), movies[-1]["_id"])
+        return {
+            "results": [{"id": movie.pop("movie_id"), **{k: v for k, v in movie.items() if k != "_id"}}
+                        for movie in movies],
+            "limit": limit,
+            "next_cursor": next_cursor
+        }
+
+    @staticmethod
+    def _card_fields(movie):
+        # popularity is a sort key: never null, so keyset cursors stay valid.
+        return {field: movie.get(field) for field in FILMOGRAPHY_FIELDS} | {"popularity": movie.get("popularity") or 0}
+
     @staticmethod
     def get_details(mongo, actor_id):
         actors_col = mongo.db.actors
-        movies_col = mongo.db.movies
 
         actor = actors_col.find_one({"id": actor_id})
-        TMDB_API_KEY = os.getenv("TMDB_API_KEY")
-        TMDB_BASE = os.getenv("TMDB_BASE", "https://api.themoviedb.org/3")
 
         def enrich_database(data):
             try:
-                processed_movies = []
-                for movie in data.get("movie_credits", {}).get("cast", []):
-                    existing = movies_col.find_one({"id": movie["id"]})
-                    if existing:
-                        processed_movies.append(existing["_id"])
-                    else:
-                        result = movies_col.insert_one(movie)
-                        processed_movies.append(result.inserted_id)
+                credits = data.get("movie_credits", {}).get("cast", [])
+                movie_ids, inserted_movies = Movie.upsert_many(mongo, credits)
+                processed_movies = [movie_ids[movie["id"]] for movie in credits if movie["id"] in movie_ids]
 
                 actor_doc = {
                     "id": data["id"],
@@ -40,50 +149,40 @@ class Actor:
                     "popularity": data.get("popularity"),
                     "place_of_birth": data.get("place_of_birth"),
                     "movie_ids": processed_movies,
+                    "filmography": Actor.store_filmography(mongo, data["id"], credits),
                     "updated_at": datetime.utcnow().timestamp()
                 }
 
-                if actor:
-                    actors_col.update_one({"id": actor_id}, {"$set": actor_doc})
-                else:
-                    actors_col.insert_one(actor_doc)
+                actors_col.update_one({"id": actor_id}, {"$set": actor_doc}, upsert=True)
+
+                cache.invalidate(f"actor:{actor_id}")
+                if inserted_movies:
+                    cache.invalidate("movies")
 
             except Exception as e:
                 print("❌ Failed to enrich actor in background:", e)
 
-        # Populate movies if found in DB
-        if actor and "movie_ids" in actor:
+        # Enriched already: the page is the document itself
+        if actor and "filmography" in actor:
             actor["_id"] = str(actor["_id"])
-            actor["movies"] = list(movies_col.find(
-                {"_id": {"$in": actor.get("movie_ids", [])}},
-                {"_id": 0, "title": 1, "poster_path": 1, "id": 1, "popularity": 1}
-            ))
-            actor["movies"].sort(key=lambda m: m.get("popularity", 0), reverse=True)
-            actor["movies"] = actor["movies"][:20]
+            actor["movies"] = actor.pop("filmography")
+            actor.pop("movie_ids", None)
             return actor
 
         # Fallback: fetch from TMDB now
         print(f"ℹ️ Fetching actor {actor_id} from TMDB...")
-        url = f"{TMDB_BASE}/person/{actor_id}"
-        params = {
-            "api_key": TMDB_API_KEY,
-            "append_to_response": "movie_credits,images"
-        }
-        res = requests.get(url, params=params)
-        if res.status_code != 200:
-            print("❌ TMDB API Error:", res.status_code)
+        data = tmdb.get(f"/person/{actor_id}", append_to_response="movie_credits,images")
+        if data is None:
             return None
 
-        data = res.json()
-
         movies = sorted(
             data.get("movie_credits", {}).get("cast", []),
             key=lambda m: m.get("popularity", 0),
             reverse=True
         )[:20]
 
-        # Start enrichment thread
-        Thread(target=lambda: enrich_database(data)).start()
+        # Queue background enrichment
+        enrichment.submit(f"actor:{actor_id}", lambda: enrich_database(data))
 
         return {
             "id": data["id"],
@@ -0,0 +1,37 @@
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+
+def upsert_by_tmdb_id(collection, docs):
+    """Resolve TMDB documents to their `_id`, inserting the missing ones.
+
+    One `$in` read finds the existing documents, then a single unordered
+    bulk write upserts the others on the unique `id` index (so a concurrent
+    enrichment cannot create duplicates). Returns ({tmdb id: _id}, inserted
+    documents).
+    """
+    tmdb_ids = list(dict.fromkeys(doc["id"] for doc in docs))
+    ids = {doc["id"]: doc["_id"] for doc in collection.find({"id": {"$in": tmdb_ids}}, {"id": 1})}
+    missing = {doc["id"]: doc for doc in docs if doc["id"] not in ids}
+    if not missing:
+        return ids, []
+
+    missing_ids = list(missing)
+    try:
+        result = collection.bulk_write(
+            [UpdateOne({"id": tmdb_id}, {"$setOnInsert": missing[tmdb_id]}, upsert=True) for tmdb_id in missing_ids],
+            ordered=False
+        )
+        upserted = result.upserted_ids
+    except BulkWriteError as e:
+        # Duplicate keys: a concurrent writer inserted some of them first.
+        upserted = {u["index"]: u["_id"] for u in e.details.get("upserted", [])}
+
+    inserted = []
+    for index, _id in upserted.items():
+        ids[missing_ids[index]] = _id
+        inserted.append(missing[missing_ids[index]])
+    unresolved = [tmdb_id for tmdb_id in missing_ids if tmdb_id not in ids]
+    if unresolved:
+        ids.update({doc["id"]: doc["_id"] for doc in collection.find({"id": {"$in": unresolved}}, {"id": 1})})
+    return ids, inserted
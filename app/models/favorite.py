@@ -0,0 +1,139 @@
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.models.taste_profile import TasteProfile
+from app.pagination import decode_cursor, encode_cursor, keyset_filter
+
+# Favorites are never deleted: removing one sets active to False. Documents
+# written before the flag existed are active when they exist; an upsert
+# creating a document has no movie_data yet, which tells the two apart.
+IS_ACTIVE = {"$cond": [
+    {"$eq": [{"$type": "$active"}, "missing"]},
+    {"$ne": [{"$type": "$movie_data"}, "missing"]},
+    "$active"
+]}
+
+LIST_PROJECTION = {
+    "_id": 1, "movie_id": 1, "added_at": 1,
+    "movie_data.id": 1, "movie_data.title": 1, "movie_data.poster_path": 1,
+    "movie_data.vote_average": 1, "movie_data.release_date": 1
+}
+# movie_data stored for favorites added without a client payload (bulk), copied from movies.
+MOVIE_CARD = {"_id": 0, "id": 1, "title": 1, "poster_path": 1, "vote_average": 1, "release_date": 1, "genres": 1}
+
+
+class Favorite:
+    @staticmethod
+    def toggle(mongo, ip, movie_id, movie_data=None):
+        """Flip a favorite in one atomic upsert on (ip, movie_id); returns True if now active."""
+        now = datetime.utcnow()
+        pipeline = [
+            {"$set": {"active": {"$not": [IS_ACTIVE]}}},
+            {"$set": {
+                "added_at": {"$cond": ["$active", now, "$added_at"]},
+                "movie_data": {"$ifNull": [{"$literal": movie_data}, "$movie_data"]},
+                "updated_at": now
+            }}
+        ]
+        try:
+            favorite = mongo.db.favorites.find_one_and_update(
+                {"ip": ip, "movie_id": movie_id}, pipeline,
+                projection={"active": 1}, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Two first clicks raced on the upsert: the other one created the document.
+            favorite = mongo.db.favorites.find_one_and_update(
+                {"ip": ip, "movie_id": movie_id}, pipeline,
+                projection={"active": 1}, return_document=ReturnDocument.AFTER
+            )
+        added = favorite["active"]
+        if added:
+            TasteProfile.record_changes(mongo, ip, added=[movie_id], movie_data={movie_id: movie_data})
+        else:
+            TasteProfile.record_changes(mongo, ip, removed=[movie_id])
+        return added
+
+    @staticmethod
+    def active_ids(mongo, ip, movie_ids):
+        return {
+            doc["movie_id"]
+            for doc in mongo.db.favorites.find(
+                {"ip": ip, "movie_id": {"$in": list(movie_ids)}, "active": {"$ne": False}}, {"_id": 0, "movie_id": 1}
+            )
+        }
+
+    @staticmethod
+    def bulk(mongo, ip, add=(), remove=(), check=(), movie_data=None):
+        """Add and remove many favorites with one bulk write; returns the state of every id involved.
+
+        Added favorites get the client's card from `movie_data` ({id: payload})
+        when given, else the one from the movies collection, as toggle stores it.
+        """
+        add, remove = list(dict.fromkeys(add)), [movie_id for movie_id in dict.fromkeys(remove) if movie_id not in add]
+        current = Favorite.active_ids(mongo, ip, add + remove) if add or remove else set()
+        added = [movie_id for movie_id in add if movie_id not in current]
+        removed = [movie_id for movie_id in remove if movie_id in current]
+
+        cards = {
+            movie["id"]: movie
+            for movie in mongo.db.movies.find({"id": {"$in": added}}, MOVIE_CARD)
+        } if added else {}
+        cards.update({movie_id: card for movie_id, card in (movie_data or {}).items() if movie_id in added and card})
+        now = datetime.utcnow()
+        writes = [
+            ({"ip": ip, "movie_id": movie_id},
+             {"$set": {"active": True, "added_at": now, "updated_at": now,
+                       **({"movie_data": cards[movie_id]} if movie_id in cards else {})}},
+             True)
+            for movie_id in added
+        ] + [
+            ({"ip": ip, "movie_id": movie_id}, {"$set": {"active": False, "updated_at": now}}, False)
+            for movie_id in removed
+        ]
+        if writes:
+            try:
+                mongo.db.favorites.bulk_write([UpdateOne(*write[:2], upsert=write[2]) for write in writes], ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != 11000 for error in errors):
+                    raise
+                # Upserts that raced with another insert: the documents exist now, update them.
+                mongo.db.favorites.bulk_write(
+                    [UpdateOne(*writes[error["index"]][:2]) for error in errors], ordered=False
+                )
+            TasteProfile.record_changes(mongo, ip, added=added, removed=removed, movie_data=cards)
+
+        state = {movie_id: True for movie_id in add}
+        state.update({movie_id: False for movie_id in remove})
+        unknown = [movie_id for movie_id in check if movie_id not in state]
+        if unknown:
+            active = Favorite.active_ids(mongo, ip, unknown)
+            state.update({movie_id: movie_id in active for movie_id in unknown})
+        return state
+
+    @staticmethod
+    def get_page(mongo, ip, limit=20, cursor=None):
+        """Active favorites, most recently added first, with the card fields of movie_data only.
+
+        Ordered on (added_at, _id): a favorite removed then added again moves
+        back to the top. `cursor` holds the (added_at, _id) of the last one.
+        """
+        query = {"ip": ip, "active": {"$ne": False}}
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 2 or not isinstance(values[1], ObjectId):
+                raise ValueError("Invalid cursor")
+            query.update(keyset_filter("added_at", -1, *values, id_direction=-1))
+        favorites = list(mongo.db.favorites.find(query, LIST_PROJECTION)
+                         .sort([("added_at", -1), ("_id", -1)]).limit(limit + 1))
+        next_cursor = None
+        if len(favorites) > limit:
+            last = favorites[limit - 1]
+            next_cursor = encode_cursor(last.get("added_at"), last["_id"])
+        favorites = favorites[:limit]
+        for favorite in favorites:
+            del favorite["_id"]
+        return {"results": favorites, "limit": limit, "next_cursor": next_cursor}
@@ -1,5 +1,23 @@
+from collections import defaultdict
 from datetime import datetime
 
+from pymongo import UpdateOne
+
+
+def genre_names(movie):
+    """Genre names of a movie, whether stored as {"id", "name"} objects or plain strings."""
+    names = []
+    for g in movie.get("genres") or []:
+        if isinstance(g, dict) and "name" in g:
+            names.append(g["name"])
+        elif isinstance(g, str):
+            names.append(g)
+    return names
+
+
+def _number(value):
+    return value if isinstance(value, (int, float)) and value == value else 0
+
 
 class Genre:
     @staticmethod
@@ -17,3 +35,55 @@ class Genre:
     def get_by_id(mongo, genre_id):
         """Get single post by ID"""
         return mongo.db.genres.find_one({"_id": genre_id})
+
+    @staticmethod
+    def stats_updates(movies, sign=1):
+        """$inc operations applying `movies` to the genre_stats counters."""
+        totals = defaultdict(lambda: {"count": 0, "rating_sum": 0, "vote_sum": 0})
+        for movie in movies:
+            for name in genre_names(movie):
+                totals[name]["count"] += sign
+                totals[name]["rating_sum"] += sign * _number(movie.get("vote_average"))
+                totals[name]["vote_sum"] += sign * _number(movie.get("vote_count"))
+        return [UpdateOne({"_id": name}, {"$inc": inc}, upsert=True) for name, inc in totals.items()]
+
+    @staticmethod
+    def record_movies(mongo, movies, sign=1):
+        """Count newly inserted (or, with sign=-1, removed) movies in genre_stats."""
+        updates = Genre.stats_updates(movies, sign)
+        if updates:
+            mongo.db.genre_stats.bulk_write(updates, ordered=False)
+
+    @staticmethod
+    def rebuild_stats(mongo):
+        """Recompute genre_stats from the movies collection (reconciliation)."""
+        mongo.db.movies.aggregate([
+            {"$unwind": "$genres"},
+            {"$group": {
+                "_id": {"$ifNull": ["$genres.name", "$genres"]},
+                "count": {"$sum": 1},
+                "rating_sum": {"$sum": {"$cond": [{"$gte": ["$vote_average", 0]}, "$vote_average", 0]}},
+                "vote_sum": {"$sum": {"$cond": [{"$gte": ["$vote_count", 0]}, "$vote_count", 0]}}
+            }},
+            {"$out": "genre_stats"}
+        ], allowDiskUse=True)
+        return mongo.db.genre_stats.count_documents({})
+
+    @staticmethod
+    def get_most_common(mongo, limit=10):
+        return [
+            {"name": g["_id"], "count": g["count"]}
+            for g in mongo.db.genre_stats.find({"count": {"$gt": 0}}).sort("count", -1).limit(limit)
+        ]
+
+    @staticmethod
+    def get_most_appreciated(mongo, limit=10):
+        return list(mongo.db.genre_stats.aggregate([
+            {"$match": {"count": {"$gt": 0}}},
+            {"$project": {
+                "avgRating": {"$divide": ["$rating_sum", "$count"]},
+                "count": 1
+            }},
+            {"$sort": {"avgRating": -1, "count": -1}},
+            {"$limit": limit}
+        ]))
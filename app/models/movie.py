@@ -1,13 +1,177 @@
-from bson import ObjectId
+from pymongo import UpdateOne
 from datetime import datetime, timedelta
-from collections import Counter
+
+from app.models.bulk import upsert_by_tmdb_id
+from app.models.genre import Genre
+from app.models.title_word import TitleWord
+from app.pagination import decode_cursor, encode_cursor, keyset_filter
+from app.text import title_words
+
+# Matches documents with a usable poster; also the filter of the partial indexes.
+HAS_POSTER = {"poster_path": {"$type": "string"}}
+
+SEARCH_PROJECTION = {
+    "_id": 1, "id": 1, "title": 1, "overview": 1, "poster_path": 1, "backdrop_path": 1,
+    "release_date": 1, "vote_average": 1, "vote_count": 1, "popularity": 1,
+    "genres": 1, "original_language": 1
+}
+
+# Catalogue fields streamed by /films/export (no credits/videos), and the ones a caller may pick.
+EXPORT_PROJECTION = {
+    "_id": 0, "id": 1, "title": 1, "original_title": 1, "overview": 1, "release_date": 1,
+    "genres": 1, "original_language": 1, "runtime": 1, "poster_path": 1, "backdrop_path": 1,
+    "vote_average": 1, "vote_count": 1, "popularity": 1, "created_at": 1, "fetched_at": 1
+}
+EXPORT_FIELDS = [field for field, included in EXPORT_PROJECTION.items() if included]
+
+# Orders of Movie.get_page, with the range that excludes movies missing the sort value
+# (each is walked on a (field -1, _id 1) index).
+PAGE_SORTS = {
+    "popularity": {"$gte": 0},
+    "vote_average": {"$gte": 0},
+    "release_date": {"$gt": ""}
+}
+
+# Fields returned by Movie.get_page per `profile`; "full" returns whole documents.
+PAGE_PROFILES = {
+    "card": {"_id": 1, "id": 1, "title": 1, "poster_path": 1, "vote_average": 1, "release_date": 1},
+    "list": SEARCH_PROJECTION,
+    "full": None
+}
+
+# Actor fields shown in movie details, and how many cast members are populated.
+ACTOR_CARD = {"id": 1, "name": 1, "profile_path": 1, "popularity": 1, "known_for_department": 1}
+DETAIL_CAST_SIZE = 6
+
+# TMDB original_language codes the MongoDB text index can stem; others use "none".
+TEXT_LANGUAGES = {"da", "de", "en", "es", "fi", "fr", "hu", "it", "nb", "nl", "pt", "ro", "ru", "sv", "tr"}
+
+
+def _populate(ids):
+    """Aggregation expression: the `people` looked up for the actor refs `ids`, in the order of `ids`."""
+    return {"$filter": {
+        "input": {"$map": {
+            "input": ids,
+            "as": "actor_id",
+            "in": {"$first": {"$filter": {"input": "$people", "cond": {"$eq": ["$$this._id", "$$actor_id"]}}}}
+        }},
+        "cond": {"$ne": ["$$this", None]}
+    }}
 
 
 class Movie:
     @staticmethod
     def create(mongo, data):
         data['created_at'] = datetime.utcnow()
-        return mongo.db.movies.insert_one(data)
+        data.update(Movie.derived_fields(data))
+        result = mongo.db.movies.insert_one(data)
+        Movie.record_inserted(mongo, [data])
+        return result
+
+    @staticmethod
+    def upsert_many(mongo, movies):
+        """Map TMDB movies to their _ids, bulk-inserting the unknown ones.
+
+        Returns ({tmdb id: _id}, inserted movies).
+        """
+        ids, inserted = upsert_by_tmdb_id(mongo.db.movies, [
+            {**movie, **Movie.derived_fields(movie), "created_at": datetime.utcnow()} for movie in movies
+        ])
+        if inserted:
+            Movie.record_inserted(mongo, inserted)
+        return ids, inserted
+
+    @staticmethod
+    def record_inserted(mongo, movies):
+        """Update the incrementally maintained statistics after inserting `movies`."""
+        Genre.record_movies(mongo, movies)
+        TitleWord.record_movies(mongo, movies)
+
+    @staticmethod
+    def derived_fields(movie):
+        """Indexed fields computed from the raw TMDB document at insert time."""
+        return {
+            **Movie.release_fields(movie.get("release_date")),
+            "search_language": language if (language := movie.get("original_language")) in TEXT_LANGUAGES else "none",
+            # Tokenized once here so that TitleWord.rebuild can count them on the server.
+            "title_terms": sorted(set(title_words(movie.get("title"), movie.get("original_language"))))
+        }
+
+    @staticmethod
+    def tmdb_fields(data):
+        """Catalogue fields of a movie inserted from a TMDB /movie/<id> payload."""
+        return {
+            "id": data["id"],
+            "title": data.get("title"),
+            "overview": data.get("overview"),
+            "release_date": data.get("release_date"),
+            "poster_path": data.get("poster_path"),
+            "backdrop_path": data.get("backdrop_path"),
+            "vote_average": data.get("vote_average"),
+            "vote_count": data.get("vote_count"),
+            "original_language": data.get("original_language"),
+            "genres": data.get("genres", []),
+            "popularity": data.get("popularity"),
+            **Movie.derived_fields(data)
+        }
+
+    @staticmethod
+    def enrichment_fields(data, actor_ids):
+        """Credits (as actor refs, in billing order), videos and runtime from a TMDB payload.
+
+        Directors and writers are also kept apart: they are the only crew shown in details.
+
+        `actor_ids` maps TMDB person ids to actor _ids (see Actor.upsert_people).
+        """
+        now = datetime.utcnow()
+        crew = [p for p in data["credits"].get("crew", []) if p["id"] in actor_ids]
+        return {
+            "credits": {
+                "cast": [actor_ids[p["id"]] for p in data["credits"].get("cast", []) if p["id"] in actor_ids],
+                "crew": [actor_ids[p["id"]] for p in crew],
+                "directors": list(dict.fromkeys(actor_ids[p["id"]] for p in crew if p.get("job") == "Director")),
+                "writers": list(dict.fromkeys(actor_ids[p["id"]] for p in crew if p.get("department") == "Writing"))
+            },
+            "videos": data.get("videos", {}),
+            "runtime": data.get("runtime"),
+            "fetched_at": now,
+            "enriched_at": now
+        }
+
+    @staticmethod
+    def release_fields(release_date):
+        """Typed, indexed fields derived from the TMDB "YYYY-MM-DD" release date."""
+        try:
+            released_at = datetime.strptime(release_date, "%Y-%m-%d")
+        except (TypeError, ValueError):
+            return {"released_at": None, "release_year": None, "decade": None}
+        return {
+            "released_at": released_at,
+            "release_year": released_at.year,
+            "decade": released_at.year // 10 * 10
+        }
+
+    @staticmethod
+    def migrate_derived_fields(mongo, batch_size=1000):
+        """Backfill the derived fields on documents imported before they existed."""
+        updated = 0
+        batch = []
+        cursor = mongo.db.movies.find(
+            {"$or": [
+                {"release_year": {"$exists": False}},
+                {"search_language": {"$exists": False}},
+                {"title_terms": {"$exists": False}}
+            ]},
+            {"release_date": 1, "original_language": 1, "title": 1}
+        ).batch_size(batch_size)
+        for doc in cursor:
+            batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": Movie.derived_fields(doc)}))
+            if len(batch) == batch_size:
+                updated += mongo.db.movies.bulk_write(batch, ordered=False).modified_count
+                batch = []
+        if batch:
+            updated += mongo.db.movies.bulk_write(batch, ordered=False).modified_count
+        return updated
 
     @staticmethod
     def get_all(mongo):
@@ -29,20 +193,60 @@ class Movie:
         return mongo.db.movies.find().sort("popularity", -1).limit(10)
 
     @staticmethod
-    def get_all_cursor(mongo, last_id=None, per_page=10):
+    def export(mongo, since=None, genre=None, decade=None, fields=None, batch_size=2000):
+        """Cursor over the catalogue for /films/export, in large batches.
+
+        `since` keeps movies created or refreshed from TMDB after that date;
+        `fields` restricts EXPORT_PROJECTION; unknown names are ignored and
+        without any known one the whole projection is used.
+        """
+        query = {}
+        if since:
+            query["$or"] = [{"created_at": {"$gte": since}}, {"fetched_at": {"$gte": since}}]
+        if genre:
+            query["genres.name"] = genre
+        if decade is not None:
+            query["decade"] = decade
+        projection = EXPORT_PROJECTION
+        if fields and (picked := [field for field in fields if field in EXPORT_FIELDS]):
+            projection = {"_id": 0, **{field: 1 for field in picked}}
+        return mongo.db.movies.find(query, projection, batch_size=batch_size)
+
+    @staticmethod
+    def get_page(mongo, sort=None, cursor=None, limit=20, profile="card"):
+        """One page of the catalogue in `sort` order (a PAGE_SORTS key, or `_id` when None).
+
+        Pages are bounded index range scans whatever their depth: `cursor` is
+        the opaque `next_cursor` of the previous page, holding (sort value, _id).
+        """
         query = {}
-        if last_id:
-            query = {"_id": {"$gt": ObjectId(last_id)}}
-        return mongo.db.movies.find(query).sort("_id", 1).limit(per_page)
+        if sort:
+            query[sort] = PAGE_SORTS[sort]
+            order = [(sort, -1), ("_id", 1)]
+        else:
+            order = [("_id", 1)]
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != len(order):
+                raise ValueError("Invalid cursor")
+            query.update(keyset_filter(sort, -1, *values) if sort else {"_id": {"$gt": values[0]}})
+
+        projection = PAGE_PROFILES[profile]
+        if projection is not None and sort:
+            projection = {**projection, sort: 1}
+        movies = list(mongo.db.movies.find(query, projection).sort(order).limit(limit))
+        next_cursor = None
+        if len(movies) == limit:
+            last = movies[-1]
+            next_cursor = encode_cursor(*[last.get(field) for field, _ in order])
+        if profile != "full":
+            for movie in movies:
+                del movie["_id"]
+        return {"movies": movies, "next_cursor": next_cursor}
 
     @staticmethod
-    def get_title_frequency(mongo):
-        titles = mongo.db.movies.distinct("title")
-        words = []
-        excluded = {"the", "a", "an", "of", "-", "_", "and", "in", "to", "de", "&"}
-        for title in titles:
-            words.extend([w for w in title.split() if w.lower() not in excluded])
-        return Counter(words).most_common(1)
+    def get_title_frequency(mongo, limit=1, genre=None, decade=None):
+        return TitleWord.get_top(mongo, limit, genre, decade)
 
     @staticmethod
     def get_popular_movies(mongo, limit=10):
@@ -51,14 +255,14 @@ class Movie:
     @staticmethod
     def get_top_rated_movies(mongo, limit=10):
         return list(mongo.db.movies.find(
-            {"poster_path": {"$ne": None}},
+            HAS_POSTER,
             {"_id": 0, "title": 1, "vote_average": 1, "poster_path": 1, "id": 1}
         ).sort("vote_average", -1).limit(limit))
 
     @staticmethod
     def get_underrated_gems(mongo, limit=20):
         return list(mongo.db.movies.find(
-            {"vote_average": {"$gte": 7}, "vote_count": {"$lte": 100}, "poster_path": {"$ne": None}},
+            {"vote_average": {"$gte": 7}, "vote_count": {"$lte": 100}, **HAS_POSTER},
             {"_id": 0, "title": 1, "vote_average": 1, "vote_count": 1, "poster_path": 1, "id": 1}
         ).sort("vote_average", -1).limit(limit))
 
@@ -70,63 +274,28 @@ class Movie:
                 "release_date": {"$gte": three_months_ago.strftime("%Y-%m-%d")},
                 "vote_count": {"$gte": 100},
                 "vote_average": {"$gte": 6.0},
-                "poster_path": {"$ne": None}
+                **HAS_POSTER
             },
             {"_id": 0, "title": 1, "vote_average": 1, "vote_count": 1, "release_date": 1, "poster_path": 1, "id": 1}
         ).sort([("vote_average", -1), ("vote_count", -1)]).limit(limit))
 
     @staticmethod
     def get_most_appreciated_genres(mongo, limit=10):
-        pipeline = [
-            {"$unwind": "$genres"},
-            {"$group": {
-                "_id": "$genres.name",
-                "avgRating": {"$avg": "$vote_average"},
-                "count": {"$sum": 1}
-            }},
-            {"$sort": {"avgRating": -1, "count": -1}},
-            {"$limit": limit}
-        ]
-        return list(mongo.db.movies.aggregate(pipeline))
+        return Genre.get_most_appreciated(mongo, limit)
 
     @staticmethod
     def get_available_decades(mongo):
-        result = mongo.db.movies.aggregate([
-            {
-                "$match": {
-                    "release_date": {"$exists": True, "$ne": "", "$regex": "^\d{4}-\d{2}-\d{2}$"}
-                }
-            },
-            {
-                "$project": {
-                    "decade": {
-                        "$concat": [
-                            {"$toString": {
-                                "$multiply": [
-                                    {"$floor": {"$divide": [{"$year": {"$toDate": "$release_date"}}, 10]}},
-                                    10
-                                ]
-                            }},
-                            "s"
-                        ]
-                    }
-                }
-            },
-            {"$group": {"_id": "$decade"}},
-            {"$sort": {"_id": 1}}
-        ])
-        return [doc["_id"] for doc in result]
+        decades = mongo.db.movies.distinct("decade")
+        return [f"{decade}s" for decade in sorted(d for d in decades if d is not None)]
 
     @staticmethod
     def get_best_movie_for_decade(mongo, decade):
-        decade_start = int(decade[:-1])
-        decade_end = decade_start + 9
         return mongo.db.movies.find_one(
             {
-                "release_date": {"$regex": f"^{decade_start}|^{decade_start+1}|^{decade_end}"},
+                "decade": int(decade[:-1]),
                 "vote_average": {"$gt": 0},
                 "vote_count": {"$gt": 0},
-                "poster_path": {"$ne": None, "$ne": ""}
+                "poster_path": {"$type": "string", "$ne": ""}
             },
             sort=[("vote_average", -1), ("vote_count", -1)],
             projection={"_id": 0, "title": 1, "vote_average": 1, "poster_path": 1}
@@ -142,7 +311,7 @@ class Movie:
     @staticmethod
     def get_most_popular(mongo):
         return list(mongo.db.movies.find(
-            {"poster_path": {"$ne": None}},
+            HAS_POSTER,
             {"_id": 0, "title": 1, "poster_path": 1, "popularity": 1, "id": 1}
         ).sort("popularity", -1).limit(15))
 
@@ -156,21 +325,21 @@ class Movie:
     @staticmethod
     def get_long_movies(mongo):
         return list(mongo.db.movies.find(
-            {"runtime": {"$gte": 150}, "poster_path": {"$ne": None}},
+            {"runtime": {"$gte": 150}, **HAS_POSTER},
             {"_id": 0, "title": 1, "poster_path": 1, "runtime": 1, "id": 1}
         ).limit(15))
 
     @staticmethod
     def get_short_movies(mongo):
         return list(mongo.db.movies.find(
-            {"runtime": {"$lte": 90}, "poster_path": {"$ne": None}},
+            {"runtime": {"$lte": 90}, **HAS_POSTER},
             {"_id": 0, "title": 1, "poster_path": 1, "runtime": 1, "id": 1}
         ).limit(15))
 
     @staticmethod
     def get_movies_by_decade(mongo, start_year):
         return list(mongo.db.movies.find(
-            {"release_date": {"$regex": f"^{start_year}"}},
+            {"decade": start_year},
             {"_id": 0, "title": 1, "poster_path": 1, "id": 1, "vote_average": 1, "vote_count": 1}
         ).limit(15))
     @staticmethod
@@ -180,7 +349,7 @@ class Movie:
                 {
                     "original_language": "fr",
                     "vote_count": {"$gte": 100},
-                    "poster_path": {"$ne": None}
+                    **HAS_POSTER
                 },
                 {"_id": 0, "title": 1, "poster_path": 1, "vote_average": 1, "id": 1}
             ).sort([("vote_average", -1), ("vote_count", -1)]).limit(limit)
@@ -193,7 +362,7 @@ class Movie:
                 {
                     "genres.name": "Action",
                     "vote_count": {"$gte": 100},
-                    "poster_path": {"$ne": None}
+                    **HAS_POSTER
                 },
                 {"_id": 0, "title": 1, "poster_path": 1, "vote_average": 1, "id": 1}
             ).sort([("vote_average", -1), ("vote_count", -1)]).limit(limit)
@@ -203,126 +372,162 @@ class Movie:
     def get_movies_from_90s(mongo, limit=15):
         return list(
             mongo.db.movies.find(
-                {
-                    "release_date": {
-                        "$regex": "^199[0-9]"  # matches 1990 to 1999
-                    }
-                },
+                {"decade": 1990},
                 {"_id": 0, "title": 1, "poster_path": 1, "id": 1}
-            ).sort("release_date", 1).limit(limit)
+            ).sort("released_at", 1).limit(limit)
         )
 
     @staticmethod
     def get_movies_by_genre(mongo, genre_name):
         return list(mongo.db.movies.find(
-            {"genres.name": genre_name, "poster_path": {"$ne": None}},
+            {"genres.name": genre_name, **HAS_POSTER},
             {"_id": 0, "title": 1, "poster_path": 1, "id": 1}
         ).limit(15))
 
     @staticmethod
     def get_true_stories(mongo):
         return list(mongo.db.movies.find(
-            {"overview": {"$regex": "true story", "$options": "i"}},
+            {"$text": {"$search": '"true story"'}},
             {"_id": 0, "title": 1, "poster_path": 1, "id": 1}
         ).limit(15))
 
     @staticmethod
-    def get_best_movies_per_decade(mongo):
-        pipeline = [
-            {
-                "$match": {
-                    "release_date": {"$exists": True, "$ne": ""},
-                    "vote_average": {"$gt": 0},
-                    "vote_count": {"$gt": 50}
-                }
-            },
-            {
-                "$addFields": {
-                    "year": {"$toInt": {"$substr": ["$release_date", 0, 4]}}
-                }
-            },
-            {
-                "$addFields": {
-                    "decade": {
-                        "$concat": [
-                            {"$toString": {"$multiply": [{"$floor": {"$divide": ["$year", 10]}}, 10]}},
-                            "s"
-                        ]
-                    }
-                }
-            },
-            {
-                "$sort": {"vote_average": -1, "vote_count": -1}
-            },
-            {
-                "$group": {
-                    "_id": "$decade",
-                    "movie": {"$first": "$$ROOT"}
-                }
-            },
-            {
-                "$replaceRoot": {"newRoot": "$movie"}
-            },
-            {
-                "$project": {
-                    "_id": 0,
-                    "id": 1,
-                    "title": 1,
-                    "vote_average": 1,
-                    "vote_count": 1,
-                    "poster_path": 1,
-                    "release_date": 1
-                }
-            },
-            {
-                "$sort": {"release_date": 1}
-            }
-        ]
+    def get_enriched(mongo, movie_ids):
+        """Enriched movies among `movie_ids` (TMDB ids), in one aggregation.
+
+        The first DETAIL_CAST_SIZE cast members, the directors and the writers
+        are populated from actors with one indexed $lookup, then each list is
+        put back in credits order; the rest of the crew is not returned.
+        Movies enriched before directors/writers were stored do not match, so
+        they go through TMDB (and are re-enriched) once.
+        """
+        return list(mongo.db.movies.aggregate([
+            {"$match": {"id": {"$in": list(movie_ids)}, "credits.directors": {"$type": "array"}}},
+            {"$set": {"cast_ids": {"$slice": ["$credits.cast", DETAIL_CAST_SIZE]}}},
+            {"$set": {"people_ids": {"$concatArrays": ["$cast_ids", "$credits.directors", "$credits.writers"]}}},
+            {"$lookup": {
+                "from": "actors",
+                "localField": "people_ids",
+                "foreignField": "_id",
+                "pipeline": [{"$project": ACTOR_CARD}],
+                "as": "people"
+            }},
+            {"$set": {"credits": {
+                "cast": _populate("$cast_ids"),
+                "directors": _populate("$credits.directors"),
+                "writers": _populate("$credits.writers")
+            }}},
+            {"$unset": ["cast_ids", "people_ids", "people", "credits.crew",
+                        "credits.cast._id", "credits.directors._id", "credits.writers._id"]}
+        ]))
 
-        return list(mongo.db.movies.aggregate(pipeline))
+    @staticmethod
+    def get_similar(mongo, movie_id, limit=15):
+        """Nearest neighbours precomputed in similar_movies (see app/similarity.py), as cards."""
+        entry = mongo.db.similar_movies.find_one({"_id": movie_id}, {"similar": {"$slice": limit}})
+        if not entry:
+            return []
+        scores = {neighbour["id"]: neighbour["score"] for neighbour in entry["similar"]}
+        movies = {
+            movie["id"]: movie
+            for movie in mongo.db.movies.find(
+                {"id": {"$in": list(scores)}},
+                {"_id": 0, "id": 1, "title": 1, "poster_path": 1, "vote_average": 1, "release_date": 1}
+            )
+        }
+        return [{**movies[movie_id], "score": score} for movie_id, score in scores.items() if movie_id in movies]
 
     @staticmethod
-    def search_movies(mongo, keyword, genre, page, limit):
-        pipeline = []
-        # print(genre)
+    def get_best_movies_per_decade(mongo):
+        """Top movie of each decade, one walk of the decade_rating index per decade."""
+        best = []
+        for decade in sorted(d for d in mongo.db.movies.distinct("decade") if d is not None):
+            movie = mongo.db.movies.find_one(
+                {"decade": decade, "vote_average": {"$gt": 0}, "vote_count": {"$gt": 50}},
+                {"_id": 0, "id": 1, "title": 1, "vote_average": 1, "vote_count": 1, "poster_path": 1, "release_date": 1},
+                sort=[("vote_average", -1), ("vote_count", -1)]
+            )
+            if movie:
+                best.append(movie)
+        return best
 
-        if keyword:
-            pipeline.append({
-                "$match": {
-                    "title": {
-                        "$regex": keyword,
-                        "$options": "i"
-                    }
-                }
-            })
+    @staticmethod
+    def search_movies(mongo, keyword, genre, limit, cursor=None, language=None):
+        """Text search with facets and keyset paging, in a single aggregation.
 
+        Results are ordered by relevance when a keyword is given, by popularity
+        otherwise; `cursor` is the `next_cursor` returned by the previous page.
+        """
+        match = {}
+        if keyword:
+            match["$text"] = {"$search": keyword}
+            if language in TEXT_LANGUAGES:
+                match["$text"]["$language"] = language
         if genre:
-            pipeline.append({
-                "$match": {
-                    "genres.name": genre
-                    # "genre_ids": genre_id
-                }
-            })
-        
-        print(genre)
-
-        # Count total results
-        count_pipeline = pipeline.copy()
-        count_pipeline.append({"$count": "total"})
-        total_result = list(mongo.db.movies.aggregate(count_pipeline))
-        total = total_result[0]['total'] if total_result else 0
-        print(total_result)
-        # Pagination logic
-        skip = (page - 1) * limit
-        pipeline.append({"$skip": skip})
-        pipeline.append({"$limit": limit})
-
-        movies = list(mongo.db.movies.aggregate(pipeline))
+            match["genres.name"] = genre
+        sort_field = "score" if keyword else "popularity"
+
+        page_filter = {}
+        if cursor:
+            value, last_id = decode_cursor(cursor)
+            page_filter = keyset_filter(sort_field, -1, value, last_id)
+
+        if not match:
+            # Browsing the whole catalogue: walk the popularity index, no facets.
+            movies = list(mongo.db.movies.find(page_filter, SEARCH_PROJECTION)
+                          .sort([("popularity", -1), ("_id", 1)]).limit(limit))
+            total = mongo.db.movies.estimated_document_count()
+            facets = {"genres": [], "decades": [], "languages": []}
+        else:
+            pipeline = [{"$match": match}]
+            if keyword:
+                pipeline.append({"$addFields": {"score": {"$meta": "textScore"}}})
+            pipeline.append({"$facet": {
+                "results": [
+                    {"$match": page_filter},
+                    {"$sort": {sort_field: -1, "_id": 1}},
+                    {"$limit": limit},
+                    {"$project": {**SEARCH_PROJECTION, "score": 1}}
+                ],
+                "total": [{"$count": "total"}],
+                "genres": [
+                    {"$unwind": "$genres"},
+                    {"$group": {"_id": "$genres.name", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                    {"$limit": 20}
+                ],
+                "decades": [
+                    {"$match": {"decade": {"$ne": None}}},
+                    {"$group": {"_id": "$decade", "count": {"$sum": 1}}},
+                    {"$sort": {"_id": 1}}
+                ],
+                "languages": [
+                    {"$group": {"_id": "$original_language", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                    {"$limit": 20}
+                ]
+            }})
+            result = next(mongo.db.movies.aggregate(pipeline))
+            movies = result["results"]
+            total = result["total"][0]["total"] if result["total"] else 0
+            facets = {
+                "genres": [{"name": f["_id"], "count": f["count"]} for f in result["genres"]],
+                "decades": [{"decade": f"{f['_id']}s", "count": f["count"]} for f in result["decades"]],
+                "languages": [{"language": f["_id"], "count": f["count"]} for f in result["languages"]]
+            }
+
+        next_cursor = None
+        if len(movies) == limit:
+            last = movies[-1]
+            next_cursor = encode_cursor(last.get(sort_field), last["_id"])
+        for movie in movies:
+            del movie["_id"]
 
         return {
             "results": movies,
-            "page": page,
             "limit": limit,
             "total": total,
-            "total_pages": (total + limit - 1) // limit
+            "total_pages": (total + limit - 1) // limit,
+            "facets": facets,
+            "next_cursor": next_cursor
         }
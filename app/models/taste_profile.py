@@ -0,0 +1,120 @@
+from datetime import datetime
+
+from app.models.genre import genre_names
+
+
+class TasteProfile:
+    """Per-user genre weights, in taste_profiles (one document per IP).
+
+    `genres` maps a genre name to the number of favorites in that genre and
+    `movie_ids` lists the favorited TMDB ids, so recommendations need a single
+    profile read. The favorites toggle keeps it up to date; a missing profile
+    is rebuilt from the favorites with one aggregation.
+    """
+
+    @staticmethod
+    def record_changes(mongo, ip, added=(), removed=(), movie_data=None):
+        """Apply favorites added and removed to the user's profile.
+
+        `movie_data` optionally maps ids to the client's movie payloads, used
+        for the genres of movies missing from the collection.
+        """
+        if not added and not removed:
+            return
+        if added and removed:
+            # $addToSet and $pull cannot target movie_ids in the same update.
+            TasteProfile.rebuild(mongo, ip)
+            return
+        movie_ids = list(added or removed)
+        movies = TasteProfile._movies(mongo, ip, movie_ids, movie_data)
+        sign = 1 if added else -1
+        weights = {}
+        for movie_id in movie_ids:
+            for name in genre_names(movies.get(movie_id, {})):
+                weights[f"genres.{name}"] = weights.get(f"genres.{name}", 0) + sign
+        update = {"$set": {"updated_at": datetime.utcnow()}}
+        if weights:
+            update["$inc"] = weights
+        if added:
+            update["$addToSet"] = {"movie_ids": {"$each": movie_ids}}
+        else:
+            update["$pull"] = {"movie_ids": {"$in": movie_ids}}
+        if not mongo.db.taste_profiles.update_one({"_id": ip}, update).matched_count:
+            # No profile yet: build it from all the favorites, these ones included.
+            TasteProfile.rebuild(mongo, ip)
+
+    @staticmethod
+    def _movies(mongo, ip, movie_ids, movie_data=None):
+        """Genres source of each movie, as in _compute: the movies collection, else the favorite's movie_data."""
+        movies = {
+            movie["id"]: movie
+            for movie in mongo.db.movies.find({"id": {"$in": movie_ids}}, {"_id": 0, "id": 1, "genres": 1})
+        }
+        missing = [movie_id for movie_id in movie_ids if movie_id not in movies]
+        movies.update({movie_id: (movie_data or {}).get(movie_id) for movie_id in missing
+                       if (movie_data or {}).get(movie_id)})
+        missing = [movie_id for movie_id in missing if movie_id not in movies]
+        if missing:
+            for favorite in mongo.db.favorites.find(
+                {"ip": ip, "movie_id": {"$in": missing}}, {"_id": 0, "movie_id": 1, "movie_data.genres": 1}
+            ):
+                if isinstance(favorite.get("movie_data"), dict):
+                    movies[favorite["movie_id"]] = favorite["movie_data"]
+        return movies
+
+    @staticmethod
+    def rebuild(mongo, ip):
+        """Recompute and store a profile; a user without favorites has none stored."""
+        profile = TasteProfile._compute(mongo, ip)
+        if profile["movie_ids"]:
+            mongo.db.taste_profiles.replace_one({"_id": ip}, profile, upsert=True)
+        else:
+            mongo.db.taste_profiles.delete_one({"_id": ip})
+        return profile
+
+    @staticmethod
+    def _compute(mongo, ip):
+        """A profile from the user's favorites joined with their movies."""
+        rows = list(mongo.db.favorites.aggregate([
+            {"$match": {"ip": ip, "active": {"$ne": False}}},
+            {"$lookup": {
+                "from": "movies",
+                "localField": "movie_id",
+                "foreignField": "id",
+                "pipeline": [{"$project": {"_id": 0, "genres": 1}}],
+                "as": "movie"
+            }},
+            # Same source as record_changes: the movie, else the favorite's movie_data.
+            {"$project": {"_id": 0, "movie_id": 1, "genres": {
+                "$ifNull": [{"$first": "$movie.genres"}, "$movie_data.genres"]
+            }}}
+        ]))
+        genres = {}
+        for row in rows:
+            for name in genre_names(row):
+                genres[name] = genres.get(name, 0) + 1
+        return {
+            "_id": ip,
+            "genres": genres,
+            "movie_ids": [row["movie_id"] for row in rows],
+            "updated_at": datetime.utcnow()
+        }
+
+    @staticmethod
+    def get(mongo, ip):
+        """The stored profile, else one built from the favorites (stored only if there are some).
+
+        Anonymous visitors without favorites therefore cost no write.
+        """
+        profile = mongo.db.taste_profiles.find_one({"_id": ip})
+        if profile:
+            return profile
+        profile = TasteProfile._compute(mongo, ip)
+        if profile["movie_ids"]:
+            mongo.db.taste_profiles.replace_one({"_id": ip}, profile, upsert=True)
+        return profile
+
+    @staticmethod
+    def top_genres(profile, limit=2):
+        weights = sorted(profile.get("genres", {}).items(), key=lambda item: -item[1])
+        return [name for name, weight in weights[:limit] if weight > 0]
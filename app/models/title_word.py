@@ -0,0 +1,98 @@
+from collections import Counter
+
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+
+from app.models.genre import genre_names
+from app.text import title_words
+
+TOP_WORDS_INDEX = IndexModel(
+    [("genre", ASCENDING), ("decade", ASCENDING), ("count", DESCENDING)], name="genre_decade_count"
+)
+
+
+def _word_keys(movie):
+    """(word, genre, decade) keys counted for a movie; None means "any"."""
+    genres = [None] + genre_names(movie)
+    decades = [None] + ([movie["decade"]] if movie.get("decade") is not None else [])
+    for word in set(title_words(movie.get("title"), movie.get("original_language"))):
+        for genre in genres:
+            for decade in decades:
+                yield word, genre, decade
+
+
+def _doc_id(word, genre, decade):
+    return f"{word}|{genre or ''}|{decade or ''}"
+
+
+class TitleWord:
+    """Word frequency of movie titles, per genre and decade, in title_words."""
+
+    @staticmethod
+    def updates(movies, sign=1):
+        counts = Counter(key for movie in movies for key in _word_keys(movie))
+        return [
+            UpdateOne(
+                {"_id": _doc_id(word, genre, decade)},
+                {"$inc": {"count": sign * count}, "$setOnInsert": {"word": word, "genre": genre, "decade": decade}},
+                upsert=True
+            )
+            for (word, genre, decade), count in counts.items()
+        ]
+
+    @staticmethod
+    def record_movies(mongo, movies, sign=1):
+        updates = TitleWord.updates(movies, sign)
+        if updates:
+            mongo.db.title_words.bulk_write(updates, ordered=False)
+
+    @staticmethod
+    def rebuild(mongo):
+        """Rebuild the whole index from the movies collection, then swap it in.
+
+        Counted on the server from the `title_terms` derived field (run
+        `movies migrate-derived-fields` first on older documents).
+        """
+        mongo.db.movies.aggregate([
+            {"$project": {
+                "_id": 0,
+                "word": "$title_terms",
+                # None is the "any genre" / "any decade" key, as in _word_keys.
+                "genre": {"$concatArrays": [[None], {"$filter": {
+                    "input": {"$map": {"input": {"$ifNull": ["$genres", []]}, "in": {"$ifNull": ["$$this.name", "$$this"]}}},
+                    "cond": {"$eq": [{"$type": "$$this"}, "string"]}
+                }}]},
+                "decade": {"$cond": [{"$eq": [{"$ifNull": ["$decade", None]}, None]}, [None], [None, "$decade"]]}
+            }},
+            {"$unwind": "$word"},
+            {"$unwind": "$genre"},
+            {"$unwind": "$decade"},
+            {"$group": {"_id": {"word": "$word", "genre": "$genre", "decade": "$decade"}, "count": {"$sum": 1}}},
+            {"$project": {
+                "_id": {"$concat": [
+                    "$_id.word", "|", {"$ifNull": ["$_id.genre", ""]}, "|",
+                    {"$ifNull": [{"$toString": "$_id.decade"}, ""]}
+                ]},
+                "word": "$_id.word",
+                "genre": "$_id.genre",
+                "decade": "$_id.decade",
+                "count": 1
+            }},
+            {"$out": "title_words_staging"}
+        ], allowDiskUse=True)
+
+        staging = mongo.db.title_words_staging
+        count = staging.count_documents({})
+        if count:
+            staging.create_indexes([TOP_WORDS_INDEX])
+            staging.rename("title_words", dropTarget=True)
+        return count
+
+    @staticmethod
+    def get_top(mongo, limit=1, genre=None, decade=None):
+        return [
+            [doc["word"], doc["count"]]
+            for doc in mongo.db.title_words.find(
+                {"genre": genre, "decade": decade, "count": {"$gt": 0}},
+                {"_id": 0, "word": 1, "count": 1}
+            ).sort("count", -1).limit(limit)
+        ]
@@ -0,0 +1,28 @@
+import base64
+
+from bson import json_util
+
+
+def encode_cursor(*values):
+    """Opaque keyset cursor holding the sort values of the last returned document."""
+    return base64.urlsafe_b64encode(json_util.dumps(list(values)).encode()).decode()
+
+
+def decode_cursor(token):
+    """Inverse of `encode_cursor`; raises ValueError on a malformed token."""
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(token.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_filter(field, direction, value, last_id, id_direction=1):
+    """Documents strictly after (value, last_id) in a `field` (direction), `_id` (id_direction) order."""
+    op = "$lt" if direction == -1 else "$gt"
+    return {"$or": [
+        {field: {op: value}},
+        {field: value, "_id": {"$lt" if id_direction == -1 else "$gt": last_id}}
+    ]}
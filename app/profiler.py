@@ -0,0 +1,187 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from bson import json_util
+from pymongo import monitoring
+
+from app.indexes import plan_stages
+from app.serialization import dumps
+
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+# Session/driver fields that must not be sent back inside an explain.
+DRIVER_FIELDS = {"$db", "lsid", "$clusterTime", "$readPreference", "txnNumber", "signature", "readConcern"}
+# Top-level fields kept as sent: they describe the query shape, not user data.
+SHAPE_FIELDS = {"sort", "projection", "limit", "skip", "batchSize", "hint", "key", "ordered", "collection"}
+
+
+def redact(value):
+    """Keep keys and operators, replace every value (IPs, search terms, ids) with "?"."""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return "?"
+
+
+def _find(doc, key):
+    """First value of `key` anywhere in an explain output (find and aggregate nest it differently)."""
+    if isinstance(doc, dict):
+        if key in doc:
+            return doc[key]
+        children = doc.values()
+    elif isinstance(doc, list):
+        children = doc
+    else:
+        return None
+    for child in children:
+        found = _find(child, key)
+        if found is not None:
+            return found
+    return None
+
+
+def _index_names(plan):
+    if not isinstance(plan, dict):
+        return []
+    names = [plan["indexName"]] if "indexName" in plan else []
+    for key in ("inputStage", "queryPlan"):
+        names += _index_names(plan.get(key))
+    for child in plan.get("inputStages", []):
+        names += _index_names(child)
+    return names
+
+
+def summarize_explain(explain):
+    """Index used, stages, examined vs returned counts and flags from an executionStats explain."""
+    stages = plan_stages(_find(explain, "winningPlan") or {})
+    stats = _find(explain, "executionStats") or {}
+    return {
+        "stages": stages,
+        "indexes": _index_names(_find(explain, "winningPlan") or {}),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "returned": stats.get("nReturned"),
+        "collscan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages
+    }
+
+
+def _caller():
+    """The innermost app frame (model or service method) that issued the command."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.") and module != __name__:
+            name = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+            return f"{module}.{name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryProfiler(monitoring.CommandListener):
+    """Records MongoDB commands slower than `threshold_ms` in a ring buffer.
+
+    Each entry holds the command (values redacted, the raw one only goes
+    to explain), the app method that sent it and its duration. Explainable
+    commands are then explained on a background thread, at most once per
+    caller and command per minute, and the summary flags COLLSCANs and
+    in-memory sorts. Entries can also be printed as one JSON line each.
+    """
+
+    def __init__(self):
+        self.threshold_ms = 0
+        self.log = False
+        self.explain = "executionStats"
+        self.entries = deque(maxlen=200)
+        self._commands = {}
+        self._explained = {}
+        self._queue = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app, mongo):
+        """Must run before the MongoDB client is created, for the listener to apply."""
+        self.threshold_ms = float(os.getenv("SLOW_QUERY_MS", 0))
+        self.log = os.getenv("SLOW_QUERY_LOG", "0") == "1"
+        # executionStats re-runs the command; queryPlanner only plans it; off skips explain.
+        self.explain = os.getenv("SLOW_QUERY_EXPLAIN", "executionStats")
+        self.entries = deque(maxlen=int(os.getenv("SLOW_QUERY_BUFFER", 200)))
+        self.mongo = mongo
+        if self._queue is None:
+            self._queue = queue.Queue(maxsize=100)
+            threading.Thread(target=self._explain_worker, name="slow-query-explain", daemon=True).start()
+            monitoring.register(self)
+
+    def started(self, event):
+        if event.command_name in EXPLAINABLE or event.command_name == "getMore":
+            self._commands[(event.connection_id, event.request_id)] = event.command
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        command = self._commands.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if command is None or duration_ms < self.threshold_ms:
+            return
+        command = {key: value for key, value in command.items() if key not in DRIVER_FIELDS}
+        entry = {
+            "at": datetime.utcnow(),
+            "duration_ms": round(duration_ms, 3),
+            "database": event.database_name,
+            "collection": command.get("collection") if event.command_name == "getMore" else command.get(event.command_name),
+            "command_name": event.command_name,
+            # Relaxed extended JSON for the shape fields: BSON types stay readable.
+            "command": json.loads(json_util.dumps({
+                key: value if key in SHAPE_FIELDS or key == event.command_name else redact(value)
+                for key, value in command.items()
+            }, json_options=json_util.RELAXED_JSON_OPTIONS)),
+            "caller": _caller(),
+            "explain": None
+        }
+        with self._lock:
+            self.entries.append(entry)
+        if event.command_name in EXPLAINABLE and self.explain != "off":
+            key = (entry["caller"], entry["collection"], event.command_name)
+            now = time.monotonic()
+            if now - self._explained.get(key, -60) >= 60:
+                self._explained[key] = now
+                try:
+                    self._queue.put_nowait((entry, command))
+                except queue.Full:
+                    pass
+        elif self.log:
+            self._print(entry)
+
+    def _explain_worker(self):
+        while True:
+            entry, command = self._queue.get()
+            try:
+                explain = self.mongo.cx[entry["database"]].command(
+                    {"explain": command, "verbosity": self.explain}
+                )
+                entry["explain"] = summarize_explain(explain)
+            except Exception as e:
+                entry["explain"] = {"error": str(e)}
+            if self.log:
+                self._print(entry)
+
+    def _print(self, entry):
+        print(dumps({"slow_query": entry}).decode())
+
+    def get_entries(self, limit=50):
+        """Newest first."""
+        with self._lock:
+            return list(reversed(self.entries))[:limit]
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from app.services.actor_service import ActorService
 from app.extensions import mongo  # ✅ utilise l'instance directement
 
@@ -11,3 +11,12 @@ def get_actor(actor_id):
     if actor:
         return jsonify(actor)
     return jsonify({"error": "Actor not found"}), 404
+
+@actors_bp.route("/<int:actor_id>/movies", methods=["GET"])
+def get_actor_movies(actor_id):
+    service = ActorService(mongo=mongo)
+    limit = max(min(int(request.args.get("limit", 20)), 100), 1)
+    try:
+        return jsonify(service.get_actor_movies(actor_id, limit, request.args.get("cursor"))), 200
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
@@ -0,0 +1,51 @@
+import hmac
+import os
+
+from flask import Blueprint, jsonify, request
+
+from app.extensions import cache, enrichment, profiler, tmdb
+
+admin_bp = Blueprint("admin", __name__)
+
+
+@admin_bp.before_request
+def require_admin_token():
+    """Every admin route needs "Authorization: Bearer <ADMIN_TOKEN>"; without ADMIN_TOKEN they are disabled."""
+    token = os.getenv("ADMIN_TOKEN")
+    if not token:
+        return jsonify({"error": "Admin endpoints are disabled (ADMIN_TOKEN is not set)."}), 403
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+
+@admin_bp.route("/cache", methods=["GET"])
+def get_cache_stats():
+    return jsonify(cache.get_stats()), 200
+
+
+@admin_bp.route("/cache", methods=["DELETE"])
+def clear_cache():
+    cache.clear()
+    return jsonify({"message": "Cache cleared."}), 200
+
+
+@admin_bp.route("/tmdb", methods=["GET"])
+def get_tmdb_stats():
+    return jsonify(tmdb.get_stats()), 200
+
+
+@admin_bp.route("/enrichment", methods=["GET"])
+def get_enrichment_stats():
+    return jsonify(enrichment.get_stats()), 200
+
+
+@admin_bp.route("/slow-queries", methods=["GET"])
+def get_slow_queries():
+    limit = min(int(request.args.get("limit", 50)), 500)
+    return jsonify({"threshold_ms": profiler.threshold_ms, "queries": profiler.get_entries(limit)}), 200
+
+
+@admin_bp.route("/slow-queries", methods=["DELETE"])
+def clear_slow_queries():
+    profiler.clear()
+    return jsonify({"message": "Slow queries cleared."}), 200
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from app.extensions import mongo
+from app.models.favorite import Favorite
 
 favorites_bp = Blueprint("favorites", __name__)
 
@@ -9,8 +10,14 @@ def get_client_ip(req):
 @favorites_bp.route("/", methods=["GET"])
 def get_favorites():
     ip = get_client_ip(request)
-    favorites = list(mongo.db.favorites.find({"ip": ip}, {"_id": 0}))
-    return jsonify(favorites), 200
+    try:
+        limit = max(min(int(request.args.get("limit", 20)), 100), 1)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    try:
+        return jsonify(Favorite.get_page(mongo, ip, limit, request.args.get("cursor"))), 200
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
 
 @favorites_bp.route("/toggle", methods=["POST"])
 def toggle_favorite():
@@ -19,15 +26,22 @@ def toggle_favorite():
     movie_id = data.get("movie_id")
     movie_data = data.get("movie_data")
 
-    existing = mongo.db.favorites.find_one({"ip": ip, "movie_id": movie_id})
+    if Favorite.toggle(mongo, ip, movie_id, movie_data):
+        return jsonify({"message": "Added to favorites", "active": True}), 200
+    return jsonify({"message": "Removed from favorites", "active": False}), 200
 
-    if existing:
-        mongo.db.favorites.delete_one({"_id": existing["_id"]})
-        return jsonify({"message": "Removed from favorites"}), 200
-    else:
-        mongo.db.favorites.insert_one({
-            "ip": ip,
-            "movie_id": movie_id,
-            "movie_data": movie_data
-        })
-        return jsonify({"message": "Added to favorites"}), 200
\ No newline at end of file
+@favorites_bp.route("/bulk", methods=["POST"])
+def bulk_favorites():
+    """{"add": [ids], "remove": [ids], "check": [ids], "movie_data": {id: card}} -> {"favorites": {id: bool}}"""
+    ip = get_client_ip(request)
+    data = request.json or {}
+    lists = {key: data.get(key) or [] for key in ("add", "remove", "check")}
+    if not all(isinstance(ids, list) for ids in lists.values()) or sum(map(len, lists.values())) > 500:
+        return jsonify({"error": "add, remove and check must be lists of at most 500 ids in total"}), 400
+
+    movie_data = data.get("movie_data") or {}
+    if not isinstance(movie_data, dict):
+        return jsonify({"error": "movie_data must map movie ids to their card"}), 400
+    movie_data = {int(movie_id): card for movie_id, card in movie_data.items() if str(movie_id).isdigit()}
+    state = Favorite.bulk(mongo, ip, **lists, movie_data=movie_data)
+    return jsonify({"favorites": {str(movie_id): active for movie_id, active in state.items()}}), 200
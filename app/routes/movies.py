@@ -1,8 +1,18 @@
-from flask import Blueprint, jsonify, request
+from datetime import datetime
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from bson import ObjectId
+from bson.errors import InvalidId
 # from app.services.post_service import PostService
 from app.extensions import mongo
+from app.jobs import get_job, start_job
+from app.models.movie import EXPORT_FIELDS, PAGE_PROFILES, PAGE_SORTS
+from app.pagination import encode_cursor
+from app.serialization import dumps
+from app.routes.favorites import get_client_ip
+from app.services.analytics_service import AnalyticsService
 from app.services.movie_service import MovieService
+from app.services.rail_service import RailService
 
 movies_bp = Blueprint('movies', __name__)
 movie_service = MovieService(mongo)
@@ -21,13 +31,50 @@ def get_movie(movie_id):
 
 @movies_bp.route('/cursor', methods=['GET'])
 def get_movies_cursor():
+    sort = request.args.get('sort')
+    # Without sort, former clients' defaults: whole documents (with _id), 10 per page.
+    profile = request.args.get('profile', 'card' if sort else 'full')
+    per_page = int(request.args.get('per_page', 20 if sort else 10))
+    cursor = request.args.get('cursor')
+    if sort not in (None, *PAGE_SORTS) or profile not in PAGE_PROFILES:
+        return jsonify({"error": f"sort must be one of {', '.join(PAGE_SORTS)}; "
+                                 f"profile one of {', '.join(PAGE_PROFILES)}"}), 400
+    if per_page < 1:
+        return jsonify({"error": "per_page must be at least 1"}), 400
     last_id = request.args.get('last_id')
-    per_page = int(request.args.get('per_page', 10))
-    movies = list(movie_service.get_movies_cursor(last_id, per_page))
-    return jsonify({
-        "movies": movies,
-        "next_cursor": str(movies[-1]['_id']) if movies else None
-    }), 200
+    if last_id and not cursor and not sort:
+        # Former clients send back the last _id, or the next_cursor they now receive.
+        cursor = encode_cursor(ObjectId(last_id)) if ObjectId.is_valid(last_id) else last_id
+    try:
+        return jsonify(movie_service.get_movies_page(sort, cursor, min(per_page, 100), profile)), 200
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+@movies_bp.route('/export', methods=['GET'])
+def export_movies():
+    """Whole catalogue as newline-delimited JSON, streamed from the cursor."""
+    try:
+        since = datetime.fromisoformat(request.args["since"]) if request.args.get("since") else None
+        decade = int(request.args["decade"]) if request.args.get("decade") else None
+    except ValueError:
+        return jsonify({"error": "since must be an ISO date and decade a year"}), 400
+    fields = [field for field in request.args.get("fields", "").split(",") if field] or None
+    unknown = [field for field in fields or [] if field not in EXPORT_FIELDS]
+    if unknown:
+        return jsonify({"error": f"Unknown fields: {', '.join(unknown)}", "allowed": EXPORT_FIELDS}), 400
+    movies = movie_service.export_movies(since, request.args.get("genre"), decade, fields)
+
+    def generate(lines_per_chunk=500):
+        lines = []
+        for movie in movies:
+            lines.append(dumps(movie))
+            if len(lines) == lines_per_chunk:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
 
 @movies_bp.route('/popular', methods=['GET'])
 def get_popular_movies():
@@ -50,13 +97,7 @@ def top_rated_movies():
 @movies_bp.route("/analytics/overview", methods=["GET"])
 def analytics_overview():
     try:
-        data = {
-            "appreciatedGenres": movie_service.get_most_appreciated_genres(),
-            "topMoviesByDecade": movie_service.get_best_movies_per_decade(),
-            "topRated": movie_service.get_top_rated_movies(),
-            "surprise": movie_service.get_underrated_gems()
-        }
-        return jsonify(data), 200
+        return jsonify(AnalyticsService(mongo).get_overview()), 200
     except Exception as e:
         print("❌ ERROR in analytics_overview:", e)
         return jsonify({"error": "Internal Server Error"}), 500
@@ -74,16 +115,27 @@ def hottest_movies():
 
 @movies_bp.route('/title_frequency', methods=['GET'])
 def get_title_frequency():
-    movies = list(movie_service.get_title_frequency())
-    return jsonify(movies), 200
+    genre = request.args.get('genre') or None
+    decade = request.args.get('decade')
+    try:
+        limit = max(min(int(request.args.get('limit', 1)), 100), 1)
+        decade = int(decade.rstrip('s')) if decade else None
+    except ValueError:
+        return jsonify({"error": "limit must be an integer and decade a year (e.g. 1990 or 1990s)"}), 400
+    words = movie_service.get_title_frequency(limit, genre, decade)
+    return jsonify(words), 200
 
 # Specific routes FIRST
 @movies_bp.route("/recommended/", methods=["GET"])
 def get_recommendations():
-    user_ip = request.remote_addr
+    user_ip = get_client_ip(request)
     recommendations = movie_service.get_recommendations(user_ip)
     return jsonify(recommendations), 200
 
+@movies_bp.route("/home", methods=["GET"])
+def get_home_rails():
+    return jsonify(RailService(mongo).get_home_rails()), 200
+
 @movies_bp.route("/new-releases", methods=["GET"])
 def get_new_releases():
     return jsonify(movie_service.get_new_releases()), 200
@@ -135,6 +187,17 @@ def get_movie_by_id(movie_id):
     except InvalidId:
         return jsonify({"error": "Invalid movie ID"}), 400
 
+@movies_bp.route("/details", methods=["GET"])
+def get_movies_details():
+    """?ids=1,2,3 -> {id: details or null}, for a whole rail in one request."""
+    try:
+        ids = list(dict.fromkeys(int(movie_id) for movie_id in request.args.get("ids", "").split(",") if movie_id))
+    except ValueError:
+        return jsonify({"error": "ids must be comma-separated TMDB ids"}), 400
+    if not ids or len(ids) > 50:
+        return jsonify({"error": "Between 1 and 50 ids are expected"}), 400
+    return jsonify(movie_service.get_detailed_movies(ids)), 200
+
 @movies_bp.route("/details/<int:movie_id>", methods=["GET"])
 def get_movie_details(movie_id):
     service = MovieService(mongo)
@@ -143,6 +206,11 @@ def get_movie_details(movie_id):
         return jsonify(movie)
     return jsonify({"error": "Movie not found"}), 404
 
+@movies_bp.route("/<int:movie_id>/similar", methods=["GET"])
+def get_similar_movies(movie_id):
+    limit = min(int(request.args.get("limit", 15)), 50)
+    return jsonify(movie_service.get_similar_movies(movie_id, limit)), 200
+
 @movies_bp.route("/best-by-decade", methods=["GET"])
 def route_best_movies_by_decade():
     return (movie_service.get_best_movies_by_decade()), 200
@@ -151,18 +219,34 @@ def route_best_movies_by_decade():
 def search_movies():
     keyword = request.args.get('q', '')
     genre = request.args.get('genre', '')
-    page = int(request.args.get('page', 1))
-    limit = int(request.args.get('limit', 10))
+    limit = max(min(int(request.args.get('limit', 10)), 100), 1)
+    cursor = request.args.get('cursor')
+    language = request.args.get('lang')
+    # Former clients always send page: the first page still works, later ones now need the cursor.
+    if request.args.get('page', '1') != '1' and not cursor:
+        return jsonify({
+            "error": "page > 1 is no longer supported: pass the next_cursor of the previous response as cursor."
+        }), 400
 
-    return jsonify(movie_service.search_movies(keyword, genre, page, limit)), 200
+    try:
+        return jsonify(movie_service.search_movies(keyword, genre, limit, cursor, language)), 200
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
 
 @movies_bp.route("/update-latest", methods=["GET"])
+@movies_bp.route("/sync", methods=["POST"])
 def updateDB():
     try:
-        print("in the routes")
-        movie_service.update_latest_movies()
-        # return additional homepage data if needed
-        return jsonify({"message": "Home loaded, latest movies updated."}), 200
+        pages = min(int(request.args.get("pages", 2)), 20)
+        job_id = start_job(mongo, "now_playing_sync", lambda: movie_service.update_latest_movies(pages))
+        return jsonify(get_job(mongo, job_id)), 202
     except Exception as e:
-        print("❌ Error updating homepage:", e)
+        print("❌ Error starting the sync:", e)
         return jsonify({"error": "Something went wrong."}), 500
+
+@movies_bp.route("/sync/<job_id>", methods=["GET"])
+def get_sync_status(job_id):
+    job = get_job(mongo, job_id)
+    if job:
+        return jsonify(job), 200
+    return jsonify({"error": "Job not found"}), 404
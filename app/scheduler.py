@@ -0,0 +1,55 @@
+import random
+import threading
+
+# Longest wait before a job's first run (random, so restarted workers do not all fire together).
+STARTUP_JITTER = 60
+
+
+class Scheduler:
+    """Runs periodic jobs on daemon threads, inside the Flask app context.
+
+    Jobs start with the first request served, so CLI commands and the
+    reloader's parent process never run them. The first run comes after a
+    short random `delay`; whether it has anything to do is the job's call
+    (see run_job's `every`).
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self._started = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def add_job(self, name, interval, func, delay=None):
+        if delay is None:
+            delay = random.uniform(0, min(interval, STARTUP_JITTER))
+        self.jobs[name] = (interval, func, delay)
+
+    def init_app(self, app):
+        @app.before_request
+        def start_scheduler():
+            if not self._started:
+                self.start(app)
+
+    def start(self, app):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for name, (interval, func, delay) in self.jobs.items():
+            threading.Thread(
+                target=self._run, args=(app, name, interval, func, delay), name=f"job-{name}", daemon=True
+            ).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, app, name, interval, func, delay):
+        self._stop.wait(delay)
+        while not self._stop.is_set():
+            with app.app_context():
+                try:
+                    func()
+                except Exception as e:
+                    print(f"❌ Scheduled job {name} failed:", e)
+            self._stop.wait(interval)
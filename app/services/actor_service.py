@@ -1,12 +1,18 @@
+from app.extensions import cache
 from app.models.actor import Actor
 
 class ActorService:
     def __init__(self, mongo):
         self.mongo = mongo
 
+    @cache.cached(ttl=600, tags=lambda self, actor_id: [f"actor:{actor_id}"])
     def get_actor_details(self, actor_id):
         try:
             return Actor.get_details(self.mongo, actor_id)
         except Exception as e:
             print("❌ Error fetching actor details:", e)
             return None
+
+    @cache.cached(ttl=600, tags=lambda self, actor_id, limit=20, cursor=None: [f"actor:{actor_id}"])
+    def get_actor_movies(self, actor_id, limit=20, cursor=None):
+        return Actor.get_movies(self.mongo, actor_id, limit, cursor)
@@ -0,0 +1,76 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+from app.models.movie import Movie
+
+ANALYTICS_REFRESH_SECONDS = int(os.getenv("ANALYTICS_REFRESH_SECONDS", 3600))
+SNAPSHOTS_KEPT = 5
+
+_refresh_lock = threading.Lock()
+
+
+class AnalyticsService:
+    def __init__(self, mongo):
+        self.mongo = mongo
+
+    def compute_overview(self):
+        """Run the overview queries concurrently.
+
+        Sub-pipelines of a $facet cannot use indexes, so each part stays an
+        index-backed query of its own and they run side by side.
+        """
+        parts = {
+            "appreciatedGenres": Movie.get_most_appreciated_genres,
+            "topMoviesByDecade": Movie.get_best_movies_per_decade,
+            "topRated": Movie.get_top_rated_movies,
+            "surprise": Movie.get_underrated_gems,
+        }
+        with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+            futures = {name: executor.submit(query, self.mongo) for name, query in parts.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+    def refresh_overview(self):
+        """Compute the overview and persist it as the next snapshot version."""
+        snapshots = self.mongo.db.analytics_snapshots
+        data = self.compute_overview()
+        latest = snapshots.find_one(sort=[("version", -1)], projection={"version": 1})
+        version = latest["version"] + 1 if latest else 1
+        snapshot = {"version": version, "data": data, "created_at": datetime.utcnow()}
+        try:
+            snapshots.insert_one(snapshot)
+        except DuplicateKeyError:
+            # Another worker stored the same version concurrently; serve theirs.
+            return snapshots.find_one({"version": version})
+        snapshots.delete_many({"version": {"$lte": version - SNAPSHOTS_KEPT}})
+        return snapshot
+
+    def refresh_overview_async(self):
+        if not _refresh_lock.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self.refresh_overview()
+            except Exception as e:
+                print("❌ Analytics refresh failed:", e)
+            finally:
+                _refresh_lock.release()
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def get_overview(self):
+        """Latest snapshot; a stale one is served while a refresh runs in the background."""
+        snapshot = self.mongo.db.analytics_snapshots.find_one(sort=[("version", -1)])
+        if not snapshot:
+            snapshot = self.refresh_overview()
+        elif snapshot["created_at"] < datetime.utcnow() - timedelta(seconds=ANALYTICS_REFRESH_SECONDS):
+            self.refresh_overview_async()
+        return {
+            **snapshot["data"],
+            "version": snapshot["version"],
+            "generated_at": snapshot["created_at"]
+        }
@@ -0,0 +1,89 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from app.extensions import cache, tmdb
+from app.models.actor import Actor
+from app.models.movie import Movie
+
+CHECKPOINT_ID = "credits_backfill"
+
+
+class BackfillService:
+    """Fills credits and videos for movies nobody has opened yet.
+
+    Movies without `enriched_at` are walked in `_id` order on the
+    (enriched_at, _id) index, their details fetched concurrently (the TMDB
+    client enforces the rate limit) and written in bulk, one batch at a
+    time. The last processed `_id` is checkpointed so a crashed run resumes
+    where it stopped.
+    """
+
+    def __init__(self, mongo):
+        self.mongo = mongo
+
+    def run(self, batch_size=100, workers=8, limit=None, restart=False):
+        checkpoints = self.mongo.db.job_checkpoints
+        if restart:
+            checkpoints.delete_one({"_id": CHECKPOINT_ID})
+        checkpoint = checkpoints.find_one({"_id": CHECKPOINT_ID}) or {}
+        last_id = checkpoint.get("last_id")
+
+        totals = {"processed": 0, "enriched": 0, "failed": 0}
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while limit is None or totals["processed"] < limit:
+                size = batch_size if limit is None else min(batch_size, limit - totals["processed"])
+                batch = self._next_batch(last_id, size)
+                if not batch:
+                    break
+
+                payloads = list(executor.map(
+                    lambda movie: tmdb.get(f"/movie/{movie['id']}", append_to_response="credits,videos"),
+                    batch
+                ))
+                enriched = self._write_batch([data for data in payloads if data])
+
+                last_id = batch[-1]["_id"]
+                totals["processed"] += len(batch)
+                totals["enriched"] += enriched
+                totals["failed"] += len(batch) - enriched
+                checkpoints.update_one(
+                    {"_id": CHECKPOINT_ID},
+                    {"$set": {"last_id": last_id, "updated_at": datetime.utcnow()},
+                     "$inc": {"processed": len(batch), "enriched": enriched}},
+                    upsert=True
+                )
+                elapsed = time.perf_counter() - started
+                print(f"🎬 {totals['processed']} movies processed, {totals['enriched']} enriched "
+                      f"({totals['processed'] / elapsed:.1f} movies/s)")
+
+        if totals["enriched"]:
+            cache.invalidate("movies")
+        totals["duration"] = round(time.perf_counter() - started, 3)
+        return totals
+
+    def _next_batch(self, last_id, size):
+        query = {"enriched_at": None, "credits": {"$exists": False}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        return list(self.mongo.db.movies.find(query, {"_id": 1, "id": 1}).sort("_id", 1).limit(size))
+
+    def _write_batch(self, payloads):
+        """Store the details of a batch: one bulk upsert of the people, one bulk update of the movies."""
+        if not payloads:
+            return 0
+        people = [
+            person for data in payloads
+            for person in data.get("credits", {}).get("cast", []) + data.get("credits", {}).get("crew", [])
+        ]
+        actor_ids = Actor.upsert_people(self.mongo, people) if people else {}
+        updates = [
+            UpdateOne({"id": data["id"]}, {"$set": Movie.enrichment_fields(data, actor_ids)})
+            for data in payloads if "credits" in data
+        ]
+        if not updates:
+            return 0
+        return self.mongo.db.movies.bulk_write(updates, ordered=False).matched_count
@@ -1,15 +1,13 @@
-from bson import ObjectId
-from datetime import datetime, timedelta
-import os
-from collections import Counter
+from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from app.models.movie import Movie
-import os
-import requests
-from threading import Thread
+from pymongo import UpdateOne
 
-TMDB_API_KEY = os.getenv("TMDB_API_KEY", "d24585bf3900cb0543080519e65e9d15")
-TMDB_BASE = os.getenv("TMDB_BASE", "https://api.themoviedb.org/3")
+from app.extensions import cache, enrichment, tmdb
+from app.models.actor import Actor
+from app.models.movie import ACTOR_CARD, DETAIL_CAST_SIZE, Movie
+from app.models.taste_profile import TasteProfile
 
 
 class MovieService:
@@ -22,252 +20,275 @@ class MovieService:
     def get_movie(self, movie_id):
         return Movie.get_by_id(self.mongo, movie_id)
 
+    @cache.cached(ttl=600, tags=["movies"])
     def get_popular_movies(self, limit=10):
         return Movie.get_popular_movies(self.mongo, limit)
 
+    @cache.cached(ttl=300, tags=["movies"])
     def get_latest_movies(self, limit=10):
         return Movie.get_latest(self.mongo, limit)
 
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_top_rated_movies(self, limit=10):
         return Movie.get_top_rated_movies(self.mongo, limit)
 
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_most_appreciated_genres(self, limit=10):
         return Movie.get_most_appreciated_genres(self.mongo, limit)
 
     def get_best_movies_by_decade(self):
         return Movie.get_best_movies_by_decade(self.mongo)
 
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_available_decades(self):
         return Movie.get_available_decades(self.mongo)
 
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_best_movie_for_decade(self, decade):
         return Movie.get_best_movie_for_decade(self.mongo, decade)
 
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_underrated_gems(self, limit=20):
         return Movie.get_underrated_gems(self.mongo, limit)
 
+    @cache.cached(ttl=600, tags=["movies"])
     def get_hottest_movies(self, limit=10):
         return Movie.get_hottest_movies(self.mongo, limit)
 
+    @cache.cached(ttl=300, tags=["movies"])
     def get_new_releases(self):
         return Movie.get_new_releases(self.mongo)
 
+    @cache.cached(ttl=600, tags=["movies"])
     def get_most_popular(self):
         return Movie.get_most_popular(self.mongo)
 
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_critically_acclaimed(self):
         return Movie.get_critically_acclaimed(self.mongo)
 
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_best_french_movies(self, limit=10):
         return Movie.get_best_french_movies(self.mongo, limit)
 
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_best_action_movies(self, limit=10):
         return Movie.get_best_action_movies(self.mongo, limit)
 
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_movies_from_90s(self, limit=15):
         return Movie.get_movies_from_90s(self.mongo, limit)
 
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_best_movies_by_decade(self, start_year):
         return Movie.get_movies_by_decade(self.mongo, start_year)
 
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_movies_by_genre(self, genre_name):
         return Movie.get_movies_by_genre(self.mongo, genre_name)
 
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_true_stories(self):
         return Movie.get_true_stories(self.mongo)
 
-    def get_title_frequency(self):
-        return Movie.get_title_frequency(self.mongo)
+    @cache.cached(ttl=3600, tags=["movies"])
+    def get_similar_movies(self, movie_id, limit=15):
+        return Movie.get_similar(self.mongo, movie_id, limit)
 
-    def get_movies_cursor(self, last_id=None, per_page=10):
-        return Movie.get_all_cursor(self.mongo, last_id, per_page)
+    @cache.cached(ttl=3600, tags=["movies"])
+    def get_title_frequency(self, limit=1, genre=None, decade=None):
+        return Movie.get_title_frequency(self.mongo, limit, genre, decade)
 
+    def export_movies(self, since=None, genre=None, decade=None, fields=None):
+        return Movie.export(self.mongo, since, genre, decade, fields)
+
+    def get_movies_page(self, sort=None, cursor=None, limit=20, profile="card"):
+        return Movie.get_page(self.mongo, sort, cursor, limit, profile)
+
+    @cache.cached(ttl=3600, tags=["movies"])
     def get_best_movies_per_decade(self):
         return Movie.get_best_movies_per_decade(self.mongo)
 
+    @cache.cached(ttl=600, tags=lambda self, movie_id: [f"movie:{movie_id}"])
     def get_detailed_movie(self, movie_id):
         try:
-            movies_col = self.mongo.db.movies
-            actors_col = self.mongo.db.actors
-
-            def ensure_actor(actor_data):
-                existing = actors_col.find_one({"id": actor_data["id"]})
-                if existing:
-                    return existing["_id"]
-                actor_doc = {
-                    "id": actor_data["id"],
-                    "name": actor_data["name"],
-                    "profile_path": actor_data.get("profile_path"),
-                    "popularity": actor_data.get("popularity"),
-                    "known_for_department": actor_data.get("known_for_department"),
-                    "fetched_at": datetime.utcnow()
-                }
-                inserted = actors_col.insert_one(actor_doc)
-                return inserted.inserted_id
-
-            def populate_actor_refs(actor_ids):
-                return list(actors_col.find(
-                    {"_id": {"$in": actor_ids}},
-                    {"_id": 0, "id": 1, "name": 1, "profile_path": 1, "popularity": 1, "known_for_department": 1}
-                ))
-
-            # 🧠 Check DB first
-            movie = movies_col.find_one({"id": movie_id})
-
-            # If enriched already, populate & return
-            if movie and "credits" in movie and isinstance(movie["credits"].get("cast"), list):
-                cast_list = movie["credits"].get("cast", [])
-                # Ensure that no out-of-range error happens when slicing
-                if len(cast_list) > 6:
-                    movie["credits"]["cast"] = populate_actor_refs(cast_list[:6])
-                else:
-                    movie["credits"]["cast"] = populate_actor_refs(cast_list)
-                return movie
-
+            # 🧠 Check DB first: enriched movies come with their people populated
+            enriched = Movie.get_enriched(self.mongo, [movie_id])
+            if enriched:
+                return enriched[0]
+            movie = self.mongo.db.movies.find_one({"id": movie_id}, {"_id": 1})
 
             # 🧪 Fetch from TMDB directly
             print(f"🔄 Fetching movie {movie_id} from TMDB...")
-            url = f"https://api.themoviedb.org/3/movie/{movie_id}"
-            params = {
-                "api_key": os.getenv("TMDB_API_KEY"),
-                "append_to_response": "credits,videos"
-            }
-            res = requests.get(url, params=params)
-            if res.status_code != 200:
-                print("TMDB API error:", res.status_code)
+            data = tmdb.get(f"/movie/{movie_id}", append_to_response="credits,videos")
+            if data is None:
                 return None
 
-            data = res.json()
-
-            # Prepare return value with cast/crew populated (not ObjectIds)
-            movie_response = {
-                "id": data["id"],
-                "title": data.get("title"),
-                "overview": data.get("overview"),
-                "release_date": data.get("release_date"),
-                "poster_path": data.get("poster_path"),
-                "backdrop_path": data.get("backdrop_path"),
-                "vote_average": data.get("vote_average"),
-                "vote_count": data.get("vote_count"),
-                "original_language": data.get("original_language"),
-                "genres": data.get("genres", []),
-                "runtime": data.get("runtime"),
-                "popularity": data.get("popularity"),
-                "videos": data.get("videos", {}),
-                "credits": {
-                    "cast": data["credits"].get("cast", [])[:6],
-                    "crew": data["credits"].get("crew", [])
-                }
-            }
-
             # 🧵 Enrich DB in background
-            def enrich_database():
-                try:
-                    cast_ids = [ensure_actor(actor) for actor in data["credits"].get("cast", [])]
-                    crew_ids = [ensure_actor(actor) for actor in data["credits"].get("crew", [])]
-
-                    update_data = {
-                        "credits": {"cast": cast_ids, "crew": crew_ids},
-                        "videos": data.get("videos", {}),
-                        "runtime": data.get("runtime"),
-                        "fetched_at": datetime.utcnow()
-                    }
-
-                    if not movie:
-                        update_data.update({
-                            "id": data["id"],
-                            "title": data.get("title"),
-                            "overview": data.get("overview"),
-                            "release_date": data.get("release_date"),
-                            "poster_path": data.get("poster_path"),
-                            "backdrop_path": data.get("backdrop_path"),
-                            "vote_average": data.get("vote_average"),
-                            "vote_count": data.get("vote_count"),
-                            "original_language": data.get("original_language"),
-                            "genres": data.get("genres", []),
-                            "popularity": data.get("popularity"),
-                        })
-                        movies_col.insert_one(update_data)
-                    else:
-                        movies_col.update_one({"id": movie_id}, {"$set": update_data})
-
-                except Exception as e:
-                    print("❌ Background enrich failed:", e)
-
-            Thread(target=enrich_database).start()
-
-            return movie_response
+            self._queue_enrichment(data, exists=movie is not None)
+            return self._movie_response(data)
 
         except Exception as e:
             print("❌ Error in get_detailed_movie:", e)
             return None
 
-    def get_recommendations(self, user_ip, limit=15):
-            favorites = list(self.mongo.db.favorites.find({"ip": user_ip}))
-            if not favorites:
-                return []
-
-            genre_counter = Counter()
-
-            for fav in favorites:
-                movie = self.get_movie(fav["movie_id"])
-                if movie and "genres" in movie:
-                    for g in movie["genres"]:
-                        genre_name = g["name"] if isinstance(g, dict) else g
-                        genre_counter[genre_name] += 1
-
-            if not genre_counter:
-                return []
-
-            top_genres = [g for g, _ in genre_counter.most_common(2)]
-
-            query = {
-                "genres": {"$elemMatch": {"name": {"$in": top_genres}}},
-                "vote_average": {"$gte": 7.0}
+    def get_detailed_movies(self, movie_ids):
+        """Details of many movies: {id: movie or None}.
+
+        Enriched movies are read with one aggregation; the others are fetched
+        from TMDB concurrently (the client enforces the rate limit) and queued
+        for enrichment, as get_detailed_movie does for one movie.
+        """
+        details = {movie["id"]: movie for movie in Movie.get_enriched(self.mongo, movie_ids)}
+        misses = [movie_id for movie_id in movie_ids if movie_id not in details]
+        if misses:
+            known = {
+                doc["id"] for doc in self.mongo.db.movies.find({"id": {"$in": misses}}, {"_id": 0, "id": 1})
             }
+            with ThreadPoolExecutor(max_workers=min(len(misses), 8)) as executor:
+                payloads = executor.map(
+                    lambda movie_id: tmdb.get(f"/movie/{movie_id}", append_to_response="credits,videos"), misses
+                )
+                for movie_id, data in zip(misses, payloads):
+                    if data is None:
+                        details[movie_id] = None
+                        continue
+                    self._queue_enrichment(data, exists=movie_id in known)
+                    details[movie_id] = self._movie_response(data)
+        return {movie_id: details.get(movie_id) for movie_id in movie_ids}
+
+    @staticmethod
+    def _movie_response(data):
+        """Details returned straight from a TMDB payload, shaped like Movie.get_enriched."""
+        crew = data["credits"].get("crew", [])
+        return {
+            "id": data["id"],
+            "title": data.get("title"),
+            "overview": data.get("overview"),
+            "release_date": data.get("release_date"),
+            "poster_path": data.get("poster_path"),
+            "backdrop_path": data.get("backdrop_path"),
+            "vote_average": data.get("vote_average"),
+            "vote_count": data.get("vote_count"),
+            "original_language": data.get("original_language"),
+            "genres": data.get("genres", []),
+            "runtime": data.get("runtime"),
+            "popularity": data.get("popularity"),
+            "videos": data.get("videos", {}),
+            "credits": {
+                "cast": [MovieService._person(p) for p in data["credits"].get("cast", [])[:DETAIL_CAST_SIZE]],
+                "directors": [MovieService._person(p) for p in crew if p.get("job") == "Director"],
+                "writers": list({
+                    p["id"]: MovieService._person(p) for p in crew if p.get("department") == "Writing"
+                }.values())
+            }
+        }
+
+    @staticmethod
+    def _person(person):
+        return {field: person.get(field) for field in ACTOR_CARD}
+
+    def _queue_enrichment(self, data, exists):
+        """Store a TMDB payload's credits and videos on a background worker."""
+        movie_id = data["id"]
+
+        def enrich_database():
+            try:
+                credits = data["credits"].get("cast", []) + data["credits"].get("crew", [])
+                update_data = Movie.enrichment_fields(data, Actor.upsert_people(self.mongo, credits))
+                if not exists:
+                    update_data.update(Movie.tmdb_fields(data))
+
+                result = self.mongo.db.movies.update_one({"id": movie_id}, {"$set": update_data}, upsert=True)
+                if result.upserted_id:
+                    Movie.record_inserted(self.mongo, [update_data])
+                    cache.invalidate(f"movie:{movie_id}", "movies")
+                else:
+                    cache.invalidate(f"movie:{movie_id}")
 
-            return list(self.mongo.db.movies.find(
-                query,
-                {"_id": 0, "title": 1, "poster_path": 1, "vote_average": 1, "id": 1}
-            ).sort("vote_average", -1).limit(limit))
+            except Exception as e:
+                print("❌ Background enrich failed:", e)
 
-    def search_movies(self, keyword, genre, page, limit):
-        return Movie.search_movies(self.mongo, keyword, genre, page, limit)
+        enrichment.submit(f"movie:{movie_id}", enrich_database)
+
+    def get_recommendations(self, user_ip, limit=15):
+        """Top-rated movies in the user's two favorite genres, minus the ones already favorited."""
+        profile = TasteProfile.get(self.mongo, user_ip)
+        top_genres = TasteProfile.top_genres(profile)
+        if not top_genres:
+            return []
+
+        query = {
+            "genres.name": {"$in": top_genres},
+            "vote_average": {"$gte": 7.0},
+            "id": {"$nin": profile.get("movie_ids", [])}
+        }
+        return list(self.mongo.db.movies.find(
+            query,
+            {"_id": 0, "title": 1, "poster_path": 1, "vote_average": 1, "id": 1}
+        ).sort("vote_average", -1).limit(limit))
+
+    @cache.cached(ttl=120, tags=["movies"])
+    def search_movies(self, keyword, genre, limit, cursor=None, language=None):
+        return Movie.search_movies(self.mongo, keyword, genre, limit, cursor, language)
 
     def update_latest_movies(self, pages=2):
+        """Sync TMDB's "now playing" pages into the movies collection.
+
+        Pages are fetched concurrently through the rate-limited TMDB client,
+        existing ids are read with one query and everything is written with a
+        single unordered bulk of upserts.
+        """
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(pages, 8)) as executor:
+            responses = list(executor.map(
+                lambda page: tmdb.get("/movie/now_playing", language="en-US", page=page),
+                range(1, pages + 1)
+            ))
+        failed_pages = sum(1 for data in responses if data is None)
+        movies = {movie["id"]: movie for data in responses if data for movie in data.get("results", [])}
+        if not movies:
+            return {"pages": pages, "failed_pages": failed_pages, "fetched": 0, "inserted": 0, "updated": 0,
+                    "duration": round(time.perf_counter() - started, 3)}
+
         movies_col = self.mongo.db.movies
-        new_movies = []
-
-        for page in range(1, pages + 1):
-            url = f"{os.getenv('TMDB_BASE')}/movie/now_playing"
-            params = {
-                "api_key": os.getenv("TMDB_API_KEY"),
-                "language": "en-US",
-                "page": page
+        existing = {doc["id"] for doc in movies_col.find({"id": {"$in": list(movies)}}, {"_id": 0, "id": 1})}
+        now = datetime.utcnow()
+        updates = []
+        for movie in movies.values():
+            refreshed = {
+                "poster_path": movie.get("poster_path"),
+                "release_date": movie.get("release_date"),
+                "title": movie.get("title"),
+                "popularity": movie.get("popularity"),
+                "fetched_at": now,
+                **Movie.derived_fields(movie)
             }
-
-            res = requests.get(url, params=params)
-            if res.status_code != 200:
-                print(f"❌ TMDB error on page {page}: {res.status_code}")
-                continue
-
-            for movie in res.json().get("results", []):
-                # Only insert if it doesn't exist
-                if not movies_col.find_one({"id": movie["id"]}):
-                    movie["fetched_at"] = datetime.utcnow()
-                    new_movies.append(movie)
-                    movies_col.insert_one(movie)
-                else:
-                    # Optional: update poster path, title, etc.
-                    movies_col.update_one(
-                        {"id": movie["id"]},
-                        {"$set": {
-                            "poster_path": movie.get("poster_path"),
-                            "release_date": movie.get("release_date"),
-                            "title": movie.get("title"),
-                            "popularity": movie.get("popularity"),
-                            "fetched_at": datetime.utcnow()
-                        }}
-                    )
-
-        print(f"✅ {len(new_movies)} new movies added to the database.")
+            on_insert = {k: v for k, v in movie.items() if k not in refreshed}
+            updates.append(UpdateOne(
+                {"id": movie["id"]},
+                {"$set": refreshed, "$setOnInsert": {**on_insert, "created_at": now}},
+                upsert=True
+            ))
+        result = movies_col.bulk_write(updates, ordered=False)
+
+        new_movies = [{**movie, **Movie.derived_fields(movie)} for movie_id, movie in movies.items() if movie_id not in existing]
+        Movie.record_inserted(self.mongo, new_movies)
+        print(f"✅ {result.upserted_count} new movies added to the database.")
+
+        # Popularity moved: re-rank the embedded filmographies listing the refreshed movies.
+        actor_ids = Actor.refresh_filmographies(
+            self.mongo, [movie for movie_id, movie in movies.items() if movie_id in existing]
+        )
+        cache.invalidate("movies", *[f"actor:{actor_id}" for actor_id in actor_ids])
+        from app.services.rail_service import RailService
+        RailService(self.mongo).refresh_home_rails()
+
+        return {
+            "pages": pages,
+            "failed_pages": failed_pages,
+            "fetched": len(movies),
+            "inserted": result.upserted_count,
+            "updated": result.modified_count,
+            "duration": round(time.perf_counter() - started, 3)
+        }
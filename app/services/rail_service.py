@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from app.models.movie import Movie
+
+# Homepage rails, keyed by the name of their standalone /films/<name> route.
+# Read from the models, not the cached MovieService methods: a materialization
+# must never persist what one worker happens to have cached.
+HOME_RAILS = {
+    "new-releases": lambda mongo: Movie.get_new_releases(mongo),
+    "most-popular": lambda mongo: Movie.get_most_popular(mongo),
+    "critically-acclaimed": lambda mongo: Movie.get_critically_acclaimed(mongo),
+    "underrated": lambda mongo: Movie.get_underrated_gems(mongo, 15),
+    "best-french": lambda mongo: Movie.get_best_french_movies(mongo, 10),
+    "best-action": lambda mongo: Movie.get_best_action_movies(mongo, 10),
+    "nostalgia-90s": lambda mongo: Movie.get_movies_by_decade(mongo, 1990),
+    "sci-fi": lambda mongo: Movie.get_movies_by_genre(mongo, "Science Fiction"),
+    "true-stories": lambda mongo: Movie.get_true_stories(mongo),
+}
+
+
+class RailService:
+    def __init__(self, mongo):
+        self.mongo = mongo
+
+    def refresh_home_rails(self):
+        """Recompute every homepage rail into the single `home_rails` document."""
+        doc = {
+            "_id": "home",
+            "rails": {name: build(self.mongo) for name, build in HOME_RAILS.items()},
+            "refreshed_at": datetime.utcnow()
+        }
+        self.mongo.db.home_rails.replace_one({"_id": "home"}, doc, upsert=True)
+        return doc
+
+    def get_home_rails(self):
+        doc = self.mongo.db.home_rails.find_one({"_id": "home"})
+        if not doc:
+            doc = self.refresh_home_rails()
+        return {"rails": doc["rails"], "refreshed_at": doc["refreshed_at"]}
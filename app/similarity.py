@@ -0,0 +1,179 @@
+"""Offline nearest-neighbour index behind /films/<id>/similar.
+
+Every movie becomes a dense, L2-normalized vector:
+
+- its overview as TF-IDF, reduced to `dims` dimensions by a fixed random
+  projection (a sparse 1M x vocabulary matrix does not fit in memory),
+- one-hot genres and original_language, weighted against the text part.
+
+Cosine similarity is then a dot product. The top-k neighbours of every movie
+are found block by block (`block_size` x `block_size` products merged into a
+running top-k), so memory stays at the N x D float32 matrix plus one block,
+and the lists are written to similar_movies, which the endpoint reads by id.
+"""
+import math
+import time
+from collections import Counter
+
+import numpy as np
+from pymongo import InsertOne
+
+from app.models.genre import genre_names
+from app.text import title_words
+
+MOVIE_FIELDS = {"_id": 1, "id": 1, "overview": 1, "genres": 1, "original_language": 1}
+
+
+def _tokens(movie):
+    return title_words(movie.get("overview"), movie.get("original_language"))
+
+
+def _scan(db, query, batch_size):
+    return db.movies.find(query, MOVIE_FIELDS).sort("_id", 1).batch_size(batch_size)
+
+
+def build_vocabulary(db, vocab_size, batch_size):
+    """First pass: document frequencies and the genre/language columns."""
+    df = Counter()
+    genres, languages = set(), Counter()
+    count, last_id = 0, None
+    for movie in _scan(db, {"id": {"$ne": None}}, batch_size):
+        df.update(set(_tokens(movie)))
+        genres.update(genre_names(movie))
+        languages[movie.get("original_language")] += 1
+        count += 1
+        last_id = movie["_id"]
+
+    # Words seen once cannot relate two movies; the rarest ones beyond the cap are dropped too.
+    words = [word for word, n in df.most_common(vocab_size) if n > 1]
+    vocabulary = {word: i for i, word in enumerate(words)}
+    idf = np.array([math.log((1 + count) / (1 + df[word])) + 1 for word in words], dtype=np.float32)
+    columns = {("genre", name): i for i, name in enumerate(sorted(genres))}
+    for language, _ in languages.most_common(50):
+        columns[("language", language)] = len(columns)
+    return count, last_id, vocabulary, idf, columns
+
+
+def build_vectors(db, count, last_id, vocabulary, idf, columns, dims, genre_weight, language_weight,
+                  batch_size, seed=0):
+    """Second pass: one normalized row per movie; returns (TMDB ids, matrix)."""
+    rng = np.random.default_rng(seed)
+    projection = rng.standard_normal((len(vocabulary), dims), dtype=np.float32) / np.sqrt(dims)
+    matrix = np.zeros((count, dims + len(columns)), dtype=np.float32)
+    ids = np.zeros(count, dtype=np.int64)
+
+    row = 0
+    for movie in _scan(db, {"id": {"$ne": None}, "_id": {"$lte": last_id}}, batch_size):
+        if row == count:
+            break
+        terms = Counter(vocabulary[word] for word in _tokens(movie) if word in vocabulary)
+        if terms:
+            indexes = np.fromiter(terms.keys(), dtype=np.int64, count=len(terms))
+            tf = 1 + np.log(np.fromiter(terms.values(), dtype=np.float32, count=len(terms)))
+            text = (tf * idf[indexes]) @ projection[indexes]
+            norm = np.linalg.norm(text)
+            if norm:
+                matrix[row, :dims] = text / norm
+
+        names = [columns[("genre", name)] for name in genre_names(movie)]
+        if names:
+            matrix[row, [dims + i for i in names]] = genre_weight / np.sqrt(len(names))
+        language = columns.get(("language", movie.get("original_language")))
+        if language is not None:
+            matrix[row, dims + language] = language_weight
+
+        norm = np.linalg.norm(matrix[row])
+        if norm:
+            matrix[row] /= norm
+        ids[row] = movie["id"]
+        row += 1
+    return ids[:row], matrix[:row]
+
+
+def top_k_blocks(matrix, k, block_size):
+    """Yield (start, neighbour indexes, scores) for each block of rows, best first.
+
+    Each row block is multiplied with every column block; the running top-k
+    is merged with the new scores using argpartition, so no N x N matrix is
+    ever materialized.
+    """
+    n = len(matrix)
+    k = min(k, n - 1)
+    if k <= 0:
+        return
+    for start in range(0, n, block_size):
+        queries = matrix[start:start + block_size]
+        rows = len(queries)
+        best_scores = np.full((rows, k), -np.inf, dtype=np.float32)
+        best_indexes = np.full((rows, k), -1, dtype=np.int64)
+        for col in range(0, n, block_size):
+            scores = queries @ matrix[col:col + block_size].T
+            if col == start:
+                np.fill_diagonal(scores, -np.inf)
+            candidates = np.concatenate([best_scores, scores], axis=1)
+            indexes = np.concatenate(
+                [best_indexes, np.broadcast_to(np.arange(col, col + scores.shape[1]), scores.shape)], axis=1
+            )
+            keep = np.argpartition(-candidates, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(candidates, keep, axis=1)
+            best_indexes = np.take_along_axis(indexes, keep, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        yield start, np.take_along_axis(best_indexes, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+def rebuild(db, k=20, dims=256, vocab_size=50000, block_size=4096, genre_weight=0.6, language_weight=0.3,
+            batch_size=5000):
+    """Rebuild similar_movies from the movies collection, then swap it in; returns timings."""
+    timings = {}
+    started = time.perf_counter()
+    count, last_id, vocabulary, idf, columns = build_vocabulary(db, vocab_size, batch_size)
+    timings["vocabulary"] = time.perf_counter() - started
+    if count < 2:
+        return {"movies": count, "timings": timings}
+
+    step = time.perf_counter()
+    ids, matrix = build_vectors(
+        db, count, last_id, vocabulary, idf, columns, dims, genre_weight, language_weight, batch_size
+    )
+    timings["vectors"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    staging = db.similar_movies_staging
+    staging.drop()
+    for start, neighbours, scores in top_k_blocks(matrix, k, block_size):
+        staging.bulk_write([
+            InsertOne({
+                "_id": int(ids[start + row]),
+                "similar": [
+                    {"id": int(ids[index]), "score": round(float(score), 4)}
+                    for index, score in zip(neighbours[row], scores[row]) if index >= 0
+                ]
+            })
+            for row in range(len(neighbours))
+        ], ordered=False)
+        print(f"🎬 {min(start + block_size, len(ids))}/{len(ids)} movies "
+              f"({time.perf_counter() - step:.0f}s)")
+    staging.rename("similar_movies", dropTarget=True)
+    timings["neighbours"] = time.perf_counter() - step
+    timings["total"] = time.perf_counter() - started
+
+    return {
+        "movies": len(ids),
+        "vocabulary": len(vocabulary),
+        "dimensions": matrix.shape[1],
+        "matrix_mb": round(matrix.nbytes / 2 ** 20, 1),
+        "timings": {name: round(seconds, 2) for name, seconds in timings.items()},
+        "query_latency_ms": sample_latency(db, ids)
+    }
+
+
+def sample_latency(db, ids, samples=200):
+    """p50/p95 of the endpoint's lookup (one read by _id), on random movies."""
+    rng = np.random.default_rng()
+    latencies = []
+    for movie_id in rng.choice(ids, size=min(samples, len(ids)), replace=False):
+        started = time.perf_counter()
+        db.similar_movies.find_one({"_id": int(movie_id)})
+        latencies.append((time.perf_counter() - started) * 1000)
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3)}
@@ -0,0 +1,42 @@
+import re
+
+# Stopwords ignored by the title word-frequency index, per TMDB original_language.
+STOPWORDS = {
+    "en": {
+        "the", "a", "an", "of", "and", "in", "to", "on", "for", "with", "at", "by", "from",
+        "is", "it", "my", "me", "you", "your", "his", "her", "i", "we", "or", "vs", "part"
+    },
+    "fr": {
+        "le", "la", "les", "l", "un", "une", "des", "de", "du", "d", "et", "en", "au", "aux",
+        "à", "pour", "sur", "dans", "par", "avec", "mon", "ma", "mes", "qui", "que"
+    },
+    "es": {
+        "el", "la", "los", "las", "un", "una", "unos", "unas", "de", "del", "y", "en", "a",
+        "al", "por", "para", "con", "mi", "que"
+    },
+    "de": {
+        "der", "die", "das", "den", "dem", "des", "ein", "eine", "einer", "und", "in", "im",
+        "von", "vom", "zu", "zum", "zur", "mit", "auf", "für"
+    },
+    "it": {
+        "il", "lo", "la", "i", "gli", "le", "un", "uno", "una", "di", "del", "della", "e",
+        "in", "a", "al", "da", "per", "con", "che"
+    },
+    "pt": {
+        "o", "a", "os", "as", "um", "uma", "de", "do", "da", "dos", "das", "e", "em", "no",
+        "na", "por", "para", "com", "que"
+    },
+}
+
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+def title_words(title, language=None):
+    """Lower-cased words of a title, without the English and `language` stopwords."""
+    if not isinstance(title, str):
+        return []
+    stopwords = STOPWORDS["en"] | STOPWORDS.get(language, set())
+    return [
+        word for word in WORD_RE.findall(title.lower())
+        if len(word) > 1 and word not in stopwords
+    ]
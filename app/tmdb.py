@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class TmdbClient:
+    """Shared TMDB API client.
+
+    Keeps connections alive through a pooled session, applies connect/read
+    timeouts, stays under TMDB's request quota with a token bucket and retries
+    429/5xx responses and network errors with exponential backoff (honouring
+    Retry-After). Returns the decoded JSON, or None when the call failed.
+    """
+
+    def __init__(self):
+        self.api_key = None
+        self.base_url = "https://api.themoviedb.org/3"
+        self.timeout = (3.05, 10)
+        self.retries = 3
+        self.backoff = 0.5
+        self.bucket = TokenBucket(40)
+        self.session = self._new_session(20)
+        self.listeners = []  # called with (path, duration, status) after every HTTP attempt
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def init_app(self, app):
+        self.api_key = os.getenv("TMDB_API_KEY")
+        self.base_url = os.getenv("TMDB_BASE", "https://api.themoviedb.org/3").rstrip("/")
+        self.timeout = (float(os.getenv("TMDB_CONNECT_TIMEOUT", 3.05)), float(os.getenv("TMDB_READ_TIMEOUT", 10)))
+        self.retries = int(os.getenv("TMDB_RETRIES", 3))
+        self.bucket = TokenBucket(float(os.getenv("TMDB_RATE_LIMIT", 40)))
+        self.session = self._new_session(int(os.getenv("TMDB_POOL_SIZE", 20)))
+
+    @staticmethod
+    def _new_session(pool_size):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def get(self, path, **params):
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        params["api_key"] = self.api_key
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            started = time.perf_counter()
+            try:
+                res = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                self._record(path, time.perf_counter() - started, type(e).__name__)
+                print(f"❌ TMDB {path} failed (attempt {attempt + 1}):", e)
+                delay = self.backoff * 2 ** attempt
+            else:
+                self._record(path, time.perf_counter() - started, res.status_code)
+                if res.status_code == 200:
+                    return res.json()
+                if res.status_code not in RETRY_STATUSES:
+                    print(f"❌ TMDB API error on {path}:", res.status_code)
+                    return None
+                delay = self._retry_after(res) or self.backoff * 2 ** attempt
+            if attempt < self.retries:
+                with self._lock:
+                    self.stats["retries"] += 1
+                time.sleep(delay)
+        print(f"❌ TMDB {path} gave up after {self.retries + 1} attempts")
+        return None
+
+    @staticmethod
+    def _retry_after(res):
+        try:
+            return float(res.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
+
+    def _record(self, path, duration, status):
+        for listener in self.listeners:
+            listener(path, duration, status)
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["latency_total"] += duration
+            self.stats["latency_max"] = max(self.stats["latency_max"], duration)
+            self.stats["statuses"][str(status)] = self.stats["statuses"].get(str(status), 0) + 1
+            if status != 200:
+                self.stats["errors"] += 1
+
+    def reset_stats(self):
+        self.stats = {"requests": 0, "errors": 0, "retries": 0, "latency_total": 0.0, "latency_max": 0.0, "statuses": {}}
+
+    def get_stats(self):
+        with self._lock:
+            stats = {**self.stats, "statuses": dict(self.stats["statuses"])}
+        stats["latency_avg"] = stats["latency_total"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
@@ -0,0 +1,127 @@
+"""Local stand-in for the TMDB API, for developing and testing without a key.
+
+    python -m app.tmdb_stub --port 8765 [--delay 0.2] [--throttle-every 10]
+    TMDB_BASE=http://localhost:8765 python run.py
+
+Serves deterministic /movie/<id>, /movie/now_playing and /person/<id>
+payloads; --throttle-every N answers every Nth request with a 429.
+"""
+import argparse
+import itertools
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_movie(movie_id):
+    return {
+        "id": movie_id,
+        "title": f"Stub movie {movie_id}",
+        "overview": "A movie served by the local TMDB stub.",
+        "release_date": f"{1950 + movie_id % 75}-01-01",
+        "poster_path": f"/poster{movie_id}.jpg",
+        "backdrop_path": f"/backdrop{movie_id}.jpg",
+        "vote_average": round(5 + movie_id % 50 / 10, 1),
+        "vote_count": movie_id % 5000,
+        "original_language": "en",
+        "genres": [{"id": 28, "name": "Action"}, {"id": 18, "name": "Drama"}][: 1 + movie_id % 2],
+        "runtime": 80 + movie_id % 100,
+        "popularity": float(movie_id % 1000),
+    }
+
+
+def fake_person(person_id, job=None):
+    person = {
+        "id": person_id,
+        "name": f"Stub person {person_id}",
+        "profile_path": f"/profile{person_id}.jpg",
+        "popularity": float(person_id % 100),
+        "known_for_department": "Directing" if job == "Director" else "Acting",
+    }
+    if job:
+        person.update({"job": job, "department": "Directing" if job == "Director" else "Writing"})
+    return person
+
+
+def movie_details(movie_id):
+    movie = fake_movie(movie_id)
+    movie["credits"] = {
+        "cast": [{**fake_person(movie_id * 100 + i), "character": f"Role {i}", "order": i} for i in range(10)],
+        "crew": [fake_person(movie_id * 100 + 50, "Director"), fake_person(movie_id * 100 + 51, "Screenplay")],
+    }
+    movie["videos"] = {"results": []}
+    return movie
+
+
+def person_details(person_id):
+    person = fake_person(person_id)
+    person.update({
+        "biography": "A person served by the local TMDB stub.",
+        "birthday": "1970-01-01",
+        "deathday": None,
+        "place_of_birth": "Localhost",
+        "movie_credits": {"cast": [fake_movie(person_id * 10 + i) for i in range(5)]},
+        "images": {"profiles": []},
+    })
+    return person
+
+
+ROUTES = [
+    (re.compile(r"^/movie/now_playing$"),
+     lambda match, query: {
+         "page": int(query.get("page", ["1"])[0]),
+         "results": [fake_movie(int(query.get("page", ["1"])[0]) * 1000 + i) for i in range(20)],
+         "total_pages": 5,
+     }),
+    (re.compile(r"^/movie/(\d+)$"), lambda match, query: movie_details(int(match.group(1)))),
+    (re.compile(r"^/person/(\d+)$"), lambda match, query: person_details(int(match.group(1)))),
+]
+
+
+def make_handler(delay, throttle_every):
+    counter = itertools.count(1)
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            path = re.sub(r"^/3", "", url.path)
+            if delay:
+                time.sleep(delay)
+            if throttle_every and next(counter) % throttle_every == 0:
+                return self._send(429, {"status_message": "Request count over limit."}, {"Retry-After": "1"})
+            for pattern, build in ROUTES:
+                match = pattern.match(path)
+                if match:
+                    return self._send(200, build(match, parse_qs(url.query)))
+            self._send(404, {"status_message": "The resource you requested could not be found."})
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def serve(port=8765, delay=0.0, throttle_every=0):
+    return ThreadingHTTPServer(("127.0.0.1", port), make_handler(delay, throttle_every))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local TMDB API stub")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every Nth request with a 429")
+    args = parser.parse_args()
+    print(f"🎬 TMDB stub listening on http://127.0.0.1:{args.port}")
+    serve(args.port, args.delay, args.throttle_every).serve_forever()
@@ -0,0 +1,91 @@
+"""Micro-benchmark of the JSON response path.
+
+    python benchmarks/json_encoding.py [--repeat 200]
+
+Encodes a 15-card rail and a 1000-row export (enriched documents: ObjectId
+credits, datetimes) with:
+
+- flask-pymongo: the BSONProvider Flask-PyMongo installs (bson.json_util),
+  which was serving every jsonify until now,
+- flask-default: Flask's DefaultJSONProvider, after converting ObjectIds to
+  strings by hand (it cannot encode them itself),
+- orjson: app.serialization.OrjsonProvider, the provider registered by create_app.
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from flask_pymongo.helpers import BSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.serialization import OrjsonProvider  # noqa: E402
+
+
+def fake_movie(i):
+    fetched_at = datetime(2025, 1, 1) + timedelta(minutes=i)
+    return {
+        "_id": ObjectId(),
+        "id": i,
+        "title": f"Movie n°{i} — l'été",
+        "overview": "A retired thief is pulled back for one last job. " * 4,
+        "release_date": "2010-07-15",
+        "released_at": datetime(2010, 7, 15),
+        "poster_path": f"/poster{i}.jpg",
+        "backdrop_path": f"/backdrop{i}.jpg",
+        "vote_average": 7.4,
+        "vote_count": 12000 + i,
+        "popularity": 80.5 - i / 100,
+        "original_language": "en",
+        "genres": [{"id": 28, "name": "Action"}, {"id": 878, "name": "Science Fiction"}],
+        "credits": {"cast": [ObjectId() for _ in range(10)], "crew": [ObjectId() for _ in range(2)]},
+        "runtime": 148,
+        "fetched_at": fetched_at,
+        "enriched_at": fetched_at,
+    }
+
+
+def stringify(value):
+    """What the routes would have to do before Flask's default encoder."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: stringify(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [stringify(item) for item in value]
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    current, default, fast = BSONProvider(app), DefaultJSONProvider(app), OrjsonProvider(app)
+    payloads = {
+        "rail (15 cards)": [fake_movie(i) for i in range(15)],
+        "export (1000 rows)": [fake_movie(i) for i in range(1000)],
+    }
+    encoders = {
+        "flask-pymongo": lambda docs: current.dumps(docs),
+        "flask-default": lambda docs: default.dumps(stringify(docs)),
+        "orjson": lambda docs: fast.dumps(docs),
+    }
+
+    print(f"{'payload':<20}{'encoder':<16}{'per call':>12}{'speedup':>12}")
+    for name, docs in payloads.items():
+        number = args.repeat if len(docs) < 100 else max(args.repeat // 20, 1)
+        baseline = None
+        for encoder, encode in encoders.items():
+            seconds = min(timeit.repeat(lambda: encode(docs), number=number, repeat=5)) / number
+            baseline = baseline or seconds
+            print(f"{name:<20}{encoder:<16}{seconds * 1e6:>10.0f}µs{baseline / seconds:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark of the block top-k kernel behind /films/<id>/similar.
+
+    python benchmarks/similarity.py [--sizes 10000 20000 40000] [--dims 320] [--k 20] [--block-size 4096]
+
+Runs app.similarity.top_k_blocks on random L2-normalized float32 vectors
+(the shape build_vectors produces: 256 projected text dimensions plus the
+genre/language columns), without MongoDB. The kernel is O(N^2 x D), so the
+last column extrapolates the measured rate to the 1M-movie catalogue.
+
+The two collection scans (vocabulary, vectors) and the endpoint's read by
+_id need a database: `flask movies build-similar` prints them.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.similarity import top_k_blocks  # noqa: E402
+
+CATALOGUE = 1_000_000
+
+
+def random_vectors(n, dims, seed=0):
+    matrix = np.random.default_rng(seed).standard_normal((n, dims), dtype=np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 20000, 40000])
+    parser.add_argument("--dims", type=int, default=320)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--block-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    print(f"{'movies':>10}{'seconds':>10}{'movies/s':>12}{'est. 1M':>12}")
+    for n in args.sizes:
+        matrix = random_vectors(n, args.dims)
+        started = time.perf_counter()
+        for _ in top_k_blocks(matrix, args.k, args.block_size):
+            pass
+        seconds = time.perf_counter() - started
+        estimate = seconds * (CATALOGUE / n) ** 2
+        print(f"{n:>10}{seconds:>10.2f}{n / seconds:>12.0f}{estimate / 60:>10.0f}min")
+
+
+if __name__ == "__main__":
+    main()